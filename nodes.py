@@ -1,5 +1,8 @@
-from typing import Any, Optional, final, Type
+from typing import Any, Optional, final, Type, Mapping, Callable, Iterable
+from types import MappingProxyType
 from abc import abstractmethod
+from functools import lru_cache
+from operator import attrgetter
 from tools import Status, status, StatusMeta
 
 # Nodes implement the calculation scheme logic.
@@ -22,6 +25,8 @@ from tools import Status, status, StatusMeta
 #     - data (if valid, read only)
 #
 class InputData(Status):
+
+    __slots__ = ()
     
     # COMMANDS
     
@@ -70,9 +75,13 @@ class InputData(Status):
 #
 class OutputData(Status):
 
+    __slots__ = ()
+
     # COMMANDS
 
     # Set data
+    # Outputs are invalidated even if `value` equals current data
+    # because data may have been mutated in place.
     # PRE: `value` type can be implicitly converted to data type
     # POST: data is set to `value`
     @abstractmethod
@@ -102,6 +111,8 @@ class OutputData(Status):
 #     - procedure
 #
 class InputProc(Status):
+
+    __slots__ = ()
     
     # Add output data node
     # PRE: `slot` exists and not occupied
@@ -137,11 +148,14 @@ class InputProc(Status):
 #
 class OutputProc(Status):
 
+    __slots__ = ()
+
     # Inform about input invalidation
     # PRE: `input` is in procedure inputs
+    # POST: returns output data that must be invalidated
     @abstractmethod
     @status("OK", "NOT_INPUT")
-    def invalidate(self, input: InputData) -> None:
+    def invalidate(self, input: InputData) -> Iterable[OutputData]:
         assert False
 
 
@@ -161,6 +175,8 @@ class OutputProc(Status):
 @final
 class DataNode(InputData, OutputData):
 
+    __slots__ = ("__input", "__outputs", "__type", "__data", "__is_valid")
+
     __input: Optional[InputProc]
     __outputs: set[OutputProc]
     __type: type
@@ -215,13 +231,18 @@ class DataNode(InputData, OutputData):
         self._set_status("add_output", "OK")
 
     # Set data
+    # Outputs are invalidated even if `value` equals current data
+    # because data may have been mutated in place.
     # PRE: `value` type can be implicitly converted to data type
     # POST: data is valid
     # POST: data is `value`
     # POST: if data was valid then all outputs are invalidated
     @status()
     def put(self, value: Any) -> None:
-        if not _type_fits(type(value), self.__type):
+        data_type = self.__type
+        value_type = type(value)
+        if value_type is not data_type \
+                and not _type_fits(value_type, data_type):
             self._set_status("put", "INCOMPATIBLE_TYPE")
             return
         self.__data = value
@@ -229,8 +250,7 @@ class DataNode(InputData, OutputData):
         if not self.is_valid():
             self.__is_valid = True
             return
-        for output in self.__outputs:
-            output.invalidate(self)
+        self.__invalidate_outputs()
 
     # Inform about input invalidation
     # POST: data is invalid
@@ -238,9 +258,8 @@ class DataNode(InputData, OutputData):
     def invalidate(self) -> None:
         if not self.is_valid():
             return
+        self.__invalidate_outputs()
         self.__is_valid = False
-        for output in self.__outputs:
-            output.invalidate(self)
 
     # Make sure data is valid
     # PRE: data is valid or input procedure can be validated
@@ -282,6 +301,33 @@ class DataNode(InputData, OutputData):
         return self.__data
 
 
+    # Invalidate all outputs
+    # Data nodes left invalid by output procedures are handled here
+    # one by one instead of recursively,
+    # so long chains of nodes do not hit the recursion limit.
+    # Node is marked invalid only after its outputs are informed.
+    def __invalidate_outputs(self) -> None:
+        nodes = self.__inform_outputs()
+        while nodes:
+            node = nodes.pop()
+            if not node.is_valid():
+                continue
+            nodes.extend(node.__inform_outputs())
+            node.__is_valid = False
+
+    # Inform output procedures about invalidation
+    # and get data nodes they leave to invalidate
+    def __inform_outputs(self) -> list["DataNode"]:
+        nodes: list[DataNode] = []
+        for output in self.__outputs:
+            for data in output.invalidate(self):
+                if isinstance(data, DataNode):
+                    nodes.append(data)
+                else:
+                    data.invalidate()
+        return nodes
+
+
 # Base class for the internal procedure of ProcedureNode
 # 
 # When the user gets any output value it must be up to date with input values.
@@ -302,18 +348,20 @@ class DataNode(InputData, OutputData):
 #
 class Procedure(Status):
 
+    __slots__ = ()
+
     # CLASS QUERIES
 
     # Get names and types of input data slots
     @classmethod
     @abstractmethod
-    def get_input_types(cls) -> dict[str, type]:
+    def get_input_types(cls) -> Mapping[str, type]:
         assert False
 
     # Create procedure for given input types that are subtypes of the slot types
     @classmethod
     @abstractmethod
-    def create(cls, input_types: dict[str, type]) -> "Procedure":
+    def create(cls, input_types: Mapping[str, type]) -> "Procedure":
         assert False
 
     
@@ -334,7 +382,7 @@ class Procedure(Status):
 
     # Get names and types of outputs
     @abstractmethod
-    def get_output_types(self) -> dict[str, type]:
+    def get_output_types(self) -> Mapping[str, type]:
         assert False
 
     # get value
@@ -357,10 +405,15 @@ class Procedure(Status):
 @final
 class ProcNode(InputProc, OutputProc):
 
+    __slots__ = ("__proc", "__output_types", "__inputs", "__input_slots",
+        "__outputs", "__output_set", "__new_inputs")
+
     __proc: Procedure
-    __output_types: dict[str, type]
+    __output_types: Mapping[str, type]
     __inputs: dict[str, InputData]
+    __input_slots: dict[InputData, str]
     __outputs: dict[str, OutputData]
+    __output_set: set[OutputData]
     __new_inputs: set[InputData]
 
 
@@ -381,7 +434,9 @@ class ProcNode(InputProc, OutputProc):
             inputs: dict[str, InputData]) -> None:
         super().__init__()
         self.__inputs = dict()
+        self.__input_slots = dict()
         self.__outputs = dict()
+        self.__output_set = set()
         proc_input_types = proc_type.get_input_types()
         if proc_input_types.keys() > inputs.keys():
             self._set_status("init", "INCOMPLETE_INPUT")
@@ -395,11 +450,13 @@ class ProcNode(InputProc, OutputProc):
                 return
         for slot, input in inputs.items():
             self.__inputs[slot] = input
+            self.__input_slots[input] = slot
             input.add_output(self)
             assert(input.is_status("add_output", "OK"))
         self.__new_inputs = set(self.__inputs.values())
         self.__proc = proc_type.create(proc_input_types)
-        self.__output_types = self.__proc.get_output_types()
+        self.__output_types = \
+            MappingProxyType(self.__proc.get_output_types())
         self._set_status("init", "OK")
 
     
@@ -418,31 +475,28 @@ class ProcNode(InputProc, OutputProc):
         if slot in self.__outputs:
             self._set_status("add_output", "SLOT_OCCUPIED")
             return
-        if output in self.__inputs.values():
-            self._set_status("add_output", "ALREADY_LINKED")
-            return
-        if output in self.__outputs.values():
+        if output in self.__input_slots or output in self.__output_set:
             self._set_status("add_output", "ALREADY_LINKED")
             return
         if not _type_fits(self.__output_types[slot], output.get_type()):
             self._set_status("add_output", "INCOMPATIBLE_TYPE")
             return
         self.__outputs[slot] = output
+        self.__output_set.add(output)
         self._set_status("add_output", "OK")
 
     # Inform about input invalidation
     # PRE: `input` is in procedure inputs
     # POST: `input` is marked as new
-    # POST: outputs are invalidated
+    # POST: returns outputs that must be invalidated
     @status()
-    def invalidate(self, input: InputData) -> None:
-        if input not in self.__inputs.values():
+    def invalidate(self, input: InputData) -> Iterable[OutputData]:
+        if input not in self.__input_slots:
             self._set_status("invalidate", "NOT_INPUT")
-            return
+            return ()
         self.__new_inputs.add(input)
         self._set_status("invalidate", "OK")
-        for output in self.__outputs.values():
-            output.invalidate()
+        return self.__outputs.values()
 
     # Request validation of all output data
     # PRE: inputs can be validated
@@ -458,19 +512,17 @@ class ProcNode(InputProc, OutputProc):
             if not input.is_status("validate", "OK"):
                 self._set_status("validate", "INPUT_VALIDATION_FAIL")
                 return
-        for slot, input in self.__inputs.items():
-            if input not in self.__new_inputs:
-                continue
+        for input in self.__new_inputs:
             assert(input.is_valid())
             data = input.get()
-            self.__proc.put(slot, data)
+            self.__proc.put(self.__input_slots[input], data)
             if self.__proc.is_status("put", "INVALID_VALUE"):
                 self._set_status("validate", "INVALID_INPUT_VALUE")
                 return
             if not self.__proc.is_status("put", "OK"):
                 self._set_status("validate", "INVALID_PROCEDURE")
                 return
-            self.__new_inputs.remove(input)
+        self.__new_inputs.clear()
         for slot, output in self.__outputs.items():
             data = self.__proc.get(slot)
             if not self.__proc.is_status("get", "OK"):
@@ -486,7 +538,7 @@ class ProcNode(InputProc, OutputProc):
     # QUERIES
 
     # Get types of procedure outputs
-    def get_output_types(self) -> dict[str, type]:
+    def get_output_types(self) -> Mapping[str, type]:
         return self.__output_types
 
 
@@ -495,10 +547,15 @@ class SimpleProcMeta(StatusMeta):
             namespace: dict[str, Any], **kwargs: Any) -> type:
         input_types, input_names = cls._get_fields(class_name, namespace, "INPUTS")
         output_types, output_names = cls._get_fields(class_name, namespace, "OUTPUTS")
-        namespace["__input_types"] = input_types
-        namespace["__output_types"] = output_types
-        namespace["__input_names"] = input_names
-        namespace["__output_names"] = output_names
+        namespace["_input_types_"] = MappingProxyType(input_types)
+        namespace["_output_types_"] = MappingProxyType(output_types)
+        namespace["_input_names_"] = input_names
+        namespace["_output_names_"] = output_names
+        namespace["_output_getters_"] = \
+            {slot: attrgetter(name) for slot, name in output_names.items()}
+        namespace["_input_specs_"] = {
+            slot: (data_type, input_names[slot], 1 << i)
+            for i, (slot, data_type) in enumerate(input_types.items())}
         return super().__new__(cls, class_name, bases, namespace, **kwargs)
 
     @staticmethod
@@ -530,37 +587,34 @@ class SimpleProcMeta(StatusMeta):
 class SimpleProc(Procedure, metaclass=SimpleProcMeta):
 
     __needs_update: bool = True
-    __invalid_input_slots: set[str] = set()
-
-    @classmethod
-    def __get_input_types(cls) -> dict[str, type]:
-        return getattr(cls, "__input_types")
-
-    def __get_output_types(self) -> dict[str, type]:
-        return getattr(self, "__output_types")
-
-    def __put(self, slot: str, value: Any) -> None:
-        setattr(self, getattr(self, "__input_names")[slot], value)
+    # Bit mask of input slots without valid values (see `_input_specs_`)
+    __invalid_inputs: int = 0
 
-    def __get(self, slot: str) -> Any:
-        return getattr(self, getattr(self, "__output_names")[slot])
+    # Set by `SimpleProcMeta` for each class
+    _input_types_: Mapping[str, type]
+    _output_types_: Mapping[str, type]
+    _input_names_: dict[str, str]
+    _output_names_: dict[str, str]
+    _output_getters_: dict[str, Callable[[Any], Any]]
+    # Type, field name and bit in invalid inputs mask for each input slot
+    _input_specs_: dict[str, tuple[type, str, int]]
 
 
     def __init__(self) -> None:
         super().__init__()
-        self.__invalid_input_slots = set(self.__get_input_types().keys())
+        self.__invalid_inputs = (1 << len(self._input_specs_)) - 1
 
 
     # CLASS QUERIES
 
     # Get names and types of input data slots
     @classmethod
-    def get_input_types(cls) -> dict[str, type]:
-        return cls.__get_input_types()
+    def get_input_types(cls) -> Mapping[str, type]:
+        return cls._input_types_
 
     # Create procedure for given input types that are subtypes of the slot types
     @classmethod
-    def create(cls, input_types: dict[str, type]) -> Procedure:
+    def create(cls, input_types: Mapping[str, type]) -> Procedure:
         return cls()
 
     
@@ -573,18 +627,21 @@ class SimpleProc(Procedure, metaclass=SimpleProcMeta):
     # POST: input data in `slot` is set to `value`
     @status()
     def put(self, slot: str, value: Any) -> None:
-        input_types = self.__get_input_types()
-        if slot not in input_types:
+        spec = self._input_specs_.get(slot)
+        if spec is None:
             self._set_status("put", "INVALID_SLOT")
             return
-        if not _type_fits(type(value), input_types[slot]):
+        data_type, name, bit = spec
+        value_type = type(value)
+        if value_type is not data_type \
+                and not _type_fits(value_type, data_type):
             self._set_status("put", "INCOMPATIBLE_TYPE")
             return
-        self.__put(slot, value)
+        setattr(self, name, value)
         if not self._is_valid_value(slot):
             self._set_status("put", "INVALID_VALUE")
             return
-        self.__invalid_input_slots.remove(slot)
+        self.__invalid_inputs &= ~bit
         self.__needs_update = True
         self._set_status("put", "OK")
 
@@ -598,12 +655,12 @@ class SimpleProc(Procedure, metaclass=SimpleProcMeta):
     # QUERIES
 
     # Get names and types of outputs
-    def get_output_types(self) -> dict[str, type]:
-        return self.__get_output_types()
+    def get_output_types(self) -> Mapping[str, type]:
+        return self._output_types_
 
     @abstractmethod
     def _is_valid_value(self, slot: str) -> bool:
-        assert(slot in self.__get_input_types())
+        assert(slot in self._input_types_)
         assert False
 
     # get value
@@ -611,19 +668,21 @@ class SimpleProc(Procedure, metaclass=SimpleProcMeta):
     # PRE: there is enough input data for calculation
     @status()
     def get(self, slot: str) -> Any:
-        if slot not in self.__get_output_types():
+        getter = self._output_getters_.get(slot)
+        if getter is None:
             self._set_status("put", "INVALID_SLOT")
             return
-        if len(self.__invalid_input_slots) > 0:
+        if self.__invalid_inputs:
             self._set_status("put", "INCOMPLETE_INPUT")
             return
         if self.__needs_update:
             self.run()
             self.__needs_update = False
         self._set_status("get", "OK")
-        return self.__get(slot)
+        return getter(self)
 
 
+@lru_cache(maxsize=512)
 def _type_fits(t: type, required: type) -> bool:
     if issubclass(t, required):
         return True
@@ -1,6 +1,8 @@
-from typing import TypeVar, Type, Any, Generic, Callable, get_origin, get_args
+from typing import TypeVar, Type, Any, Generic, Callable, Optional, \
+    get_origin, get_args
 from abc import abstractmethod
-from inspect import getfullargspec
+from functools import lru_cache
+from inspect import signature, Parameter
 
 from tools import Status, status, StatusMeta
 
@@ -84,15 +86,26 @@ class Slot(DataSource, DataDest):
     __type: type
     __value: Any
     __has_data: bool
+    __set_ok: bool
+    __get_ok: bool
+    __on_fill: Optional[Callable[[], None]]
+    __on_clear: Optional[Callable[[], None]]
     
     
     # CONSTRUCTOR
+    # `on_fill` and `on_clear` are called when data state changes
     # POST: data type is `data_type`
     # POST: no data
-    def __init__(self, data_type: type) -> None:
+    def __init__(self, data_type: type,
+            on_fill: Optional[Callable[[], None]] = None,
+            on_clear: Optional[Callable[[], None]] = None) -> None:
         super().__init__()
         self.__type = data_type
         self.__has_data = False
+        self.__set_ok = False
+        self.__get_ok = False
+        self.__on_fill = on_fill
+        self.__on_clear = on_clear
 
     
     # COMMANDS
@@ -102,17 +115,32 @@ class Slot(DataSource, DataDest):
     # POST: data is `value`
     @status("OK", "INVALID_TYPE")
     def set(self, value: Any) -> None:
-        if not _type_fits(type(value), self.__type):
+        data_type = self.__type
+        value_type = type(value)
+        if value_type is not data_type \
+                and not _type_fits(value_type, data_type):
             self._set_status("set", "INVALID_TYPE")
+            self.__set_ok = False
             return
-        self._set_status("set", "OK")
-        self.__has_data = True
+        # status is written only when it actually changes to 'OK'
+        if not self.__set_ok:
+            self._set_status("set", "OK")
+            self.__set_ok = True
         self.__value = value
+        if self.__has_data:
+            return
+        self.__has_data = True
+        if self.__on_fill is not None:
+            self.__on_fill()
 
     # Delete data
     # POST: no data
     def clear(self) -> None:
+        if not self.__has_data:
+            return
         self.__has_data = False
+        if self.__on_clear is not None:
+            self.__on_clear()
     
     
     # QUERIES
@@ -131,8 +159,17 @@ class Slot(DataSource, DataDest):
     def get(self) -> Any:
         if not self.__has_data:
             self._set_status("get", "NO_DATA")
+            self.__get_ok = False
             return None
-        self._set_status("get", "OK")
+        if not self.__get_ok:
+            self._set_status("get", "OK")
+            self.__get_ok = True
+        return self.__value
+
+    # Get data without status update
+    # Used by procedures that have already checked data state
+    # PRE: has data
+    def _get_unchecked(self) -> Any:
         return self.__value
 
 
@@ -217,21 +254,42 @@ class CalculatorMeta(StatusMeta):
 # and performs calculations using custom algorithm
 class Calculator(Procedure, metaclass=CalculatorMeta):
 
-    __input_fields: dict[str, str]
-    __output_fields: dict[str, str]
+    __input_slots: dict[str, Slot]
+    __output_slots: dict[str, Slot]
+    __missing_inputs: int
+    __missing_outputs: int
 
     # CONSTRUCTOR
     # POST: all `Input` and `Output` fields contain slots of specified types
     def __init__(self) -> None:
         super().__init__()
-        self.__input_fields = dict()
-        self.__output_fields = dict()
+        self.__input_slots = dict()
+        self.__output_slots = dict()
         for slot_name, field_name, data_type in getattr(self, "__inputs"):
-            setattr(self, field_name, Slot(data_type))
-            self.__input_fields[slot_name] = field_name
+            slot = Slot(data_type, self.__input_filled, self.__input_cleared)
+            setattr(self, field_name, slot)
+            self.__input_slots[slot_name] = slot
         for slot_name, field_name, data_type in getattr(self, "__outputs"):
-            setattr(self, field_name, Slot(data_type))
-            self.__output_fields[slot_name] = field_name
+            slot = Slot(data_type, self.__output_filled, self.__output_cleared)
+            setattr(self, field_name, slot)
+            self.__output_slots[slot_name] = slot
+        self.__missing_inputs = len(self.__input_slots)
+        self.__missing_outputs = len(self.__output_slots)
+
+    # Slot data state callbacks
+    # Keep the number of slots without data up to date
+
+    def __input_filled(self) -> None:
+        self.__missing_inputs -= 1
+
+    def __input_cleared(self) -> None:
+        self.__missing_inputs += 1
+
+    def __output_filled(self) -> None:
+        self.__missing_outputs -= 1
+
+    def __output_cleared(self) -> None:
+        self.__missing_outputs += 1
     
     
     # COMMANDS
@@ -243,20 +301,16 @@ class Calculator(Procedure, metaclass=CalculatorMeta):
     # POST: all outputs have data
     @status("OK", "INVALID_INPUT", "INTERNAL_ERROR")
     def run(self) -> None:
-        for field_name in self.__input_fields.values():
-            slot: Slot = getattr(self, field_name)
-            if not slot.has_data():
-                self._set_status("run", "INVALID_INPUT")
-                return
+        if self.__missing_inputs > 0:
+            self._set_status("run", "INVALID_INPUT")
+            return
         self.calculate()
         if not self.is_status("calculate", "OK"):
             self._set_status("run", "INTERNAL_ERROR")
             return
-        for field_name in self.__output_fields.values():
-            slot: Slot = getattr(self, field_name)
-            if not slot.has_data():
-                self._set_status("run", "INTERNAL_ERROR")
-                return
+        if self.__missing_outputs > 0:
+            self._set_status("run", "INTERNAL_ERROR")
+            return
         self._set_status("run", "OK")
 
     # Run calculations
@@ -273,31 +327,31 @@ class Calculator(Procedure, metaclass=CalculatorMeta):
 
     # Get IDs of input slots
     def get_input_ids(self) -> set[str]:
-        return set(self.__input_fields.keys())
+        return set(self.__input_slots.keys())
 
     # Get IDs of output slots
     def get_output_ids(self) -> set[str]:
-        return set(self.__output_fields.keys())
+        return set(self.__output_slots.keys())
 
     # Get input slot
     # PRE: `id` is valid input slot ID
     @status("OK", "INVALID_ID")
     def get_input(self, id: str) -> DataDest:
-        if id not in self.__input_fields:
+        if id not in self.__input_slots:
             self._set_status("get_input", "INVALID_ID")
             return Slot(object)
         self._set_status("get_input", "OK")
-        return getattr(self, self.__input_fields[id])
+        return self.__input_slots[id]
 
     # Get output slot
     # PRE: `id` is valid output slot ID
     @status("OK", "INVALID_ID")
     def get_output(self, id: str) -> DataSource:
-        if id not in self.__output_fields:
+        if id not in self.__output_slots:
             self._set_status("get_output", "INVALID_ID")
             return Slot(object)
         self._set_status("get_output", "OK")
-        return getattr(self, self.__output_fields[id])
+        return self.__output_slots[id]
 
 
 # Procedure that wraps a function giving names to the returned tuple elements
@@ -308,32 +362,60 @@ class Wrapper(Procedure):
     __output_ids: list[str]
     __inputs: dict[str, Slot]
     __outputs: dict[str, Slot]
+    __input_slot_tuple: tuple[Slot, ...]
+    __output_slot_tuple: tuple[Slot, ...]
+    __output_types: tuple[type, ...]
+    # Number of input slots without data
+    __missing_inputs: int
+    __put_result: Callable[[Any], bool]
 
     
     # CONSTRUCTOR
     def __init__(self, func: AnyFunc[T], output_ids: list[str]) -> None:
         super().__init__()
         self.__func = func
-        arg_spec = getfullargspec(func)
-        self.__input_ids = arg_spec.args
+        self.__put_result = self.__put_multiple
+        func_signature = signature(func)
+        input_params = [param
+            for param in func_signature.parameters.values()
+            if param.kind in _POSITIONAL_KINDS]
+        self.__input_ids = [param.name for param in input_params]
         self.__output_ids = output_ids
         self.__inputs = dict()
         self.__outputs = dict()
-        for id in self.__input_ids:
-            self.__inputs[id] = Slot(arg_spec.annotations[id])
-        if "return" not in arg_spec.annotations:
+        for param in input_params:
+            self.__inputs[param.name] = Slot(param.annotation,
+                self.__input_filled, self.__input_cleared)
+        self.__input_slot_tuple = \
+            tuple(self.__inputs[id] for id in self.__input_ids)
+        self.__missing_inputs = len(self.__input_slot_tuple)
+        return_type = func_signature.return_annotation
+        if return_type is Parameter.empty:
             assert len(output_ids) == 0
-            return
-        return_type = arg_spec.annotations["return"]
-        if get_origin(return_type) is not tuple:
+            output_types = tuple[type, ...]()
+            self.__put_result = self.__put_nothing
+        elif get_origin(return_type) is not tuple:
             assert len(output_ids) == 1
-            self.__outputs[output_ids[0]] = Slot(return_type)
-            return
-        output_types = get_args(return_type)
-        for i in range(len(self.__output_ids)):
-            id = self.__output_ids[i]
-            data_type = output_types[i]
+            output_types = (return_type,)
+            self.__put_result = self.__put_single
+        else:
+            output_types = get_args(return_type)
+            assert len(output_types) == len(output_ids)
+        for id, data_type in zip(self.__output_ids, output_types):
             self.__outputs[id] = Slot(data_type)
+        self.__output_slot_tuple = \
+            tuple(self.__outputs[id] for id in self.__output_ids)
+        self.__output_types = \
+            tuple(slot.get_type() for slot in self.__output_slot_tuple)
+
+    # Input slot data state callbacks
+    # Keep the number of input slots without data up to date
+
+    def __input_filled(self) -> None:
+        self.__missing_inputs -= 1
+
+    def __input_cleared(self) -> None:
+        self.__missing_inputs += 1
     
     
     # COMMANDS
@@ -344,29 +426,48 @@ class Wrapper(Procedure):
     # POST: all outputs have data
     @status("OK", "INVALID_INPUT", "INTERNAL_ERROR")
     def run(self) -> None:
-        args = list[Any]()
-        for id in self.__input_ids:
-            input = self.__inputs[id]
-            if not input.has_data():
-                self._set_status("run", "INVALID_INPUT")
-                return
-            args.append(input.get())
+        if self.__missing_inputs > 0:
+            self._set_status("run", "INVALID_INPUT")
+            return
+        args = [input._get_unchecked() for input in self.__input_slot_tuple]
         try:
             result = self.__func(*args)
-        except:
+        except Exception:
+            self._set_status("run", "INTERNAL_ERROR")
+            return
+        if not self.__put_result(result):
             self._set_status("run", "INTERNAL_ERROR")
             return
-        if len(self.__output_ids) == 1:
-            result = tuple(result,)
-        for i in range(len(self.__output_ids)):
-            value = result[i]
-            id = self.__output_ids[i]
-            output = self.__outputs[id]
-            if not _type_fits(type(value), output.get_type()):
-                self._set_status("run", "INTERNAL_ERROR")
-                return
+        self._set_status("run", "OK")
+
+    # Ignore result of function without outputs
+    def __put_nothing(self, result: Any) -> bool:
+        return True
+
+    # Put function result to the only output slot
+    # Returns `False` if result type does not fit
+    def __put_single(self, result: Any) -> bool:
+        data_type = self.__output_types[0]
+        value_type = type(result)
+        if value_type is not data_type \
+                and not _type_fits(value_type, data_type):
+            return False
+        self.__output_slot_tuple[0].set(result)
+        return True
+
+    # Put function result tuple elements to output slots
+    # Returns `False` if result length or any element type does not fit
+    def __put_multiple(self, result: Any) -> bool:
+        if len(result) != len(self.__output_slot_tuple):
+            return False
+        for output, data_type, value in \
+                zip(self.__output_slot_tuple, self.__output_types, result):
+            value_type = type(value)
+            if value_type is not data_type \
+                    and not _type_fits(value_type, data_type):
+                return False
             output.set(value)
-        self._set_status("run", "OK")        
+        return True
 
 
     # QUERIES
@@ -446,6 +547,11 @@ class Block(Procedure):
         assert False
 
 
+# Kinds of function parameters that are wrapper inputs
+_POSITIONAL_KINDS = (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+
+
+@lru_cache(maxsize=1024)
 def _type_fits(t: type, required: type) -> bool:
     if issubclass(t, required):
         return True
@@ -1,8 +1,20 @@
-from typing import Any, final, Optional, Generic, TypeVar
+from typing import Any, final, Optional, Generic, TypeVar, Iterable, \
+    Mapping, Callable
+from types import MappingProxyType
 from abc import abstractmethod
+from functools import lru_cache, partial
+from operator import attrgetter
+from concurrent.futures import Executor
+from collections import OrderedDict
+from math import copysign
+import sys
 from tools import Status, status, StatusMeta
 
 
+# Marker of missing value where `None` is a valid value
+_NO_VALUE = object()
+
+
 # Basic calculation logic unit
 # CONTAINS:
 #   - input slots (names and types)
@@ -11,6 +23,8 @@ from tools import Status, status, StatusMeta
 #   - output values
 #   - input status (changed after last run or not)
 class Procedure(Status):
+
+    __slots__ = ()
     
     # COMMANDS
 
@@ -38,12 +52,12 @@ class Procedure(Status):
 
     # Get description of input slots
     @abstractmethod
-    def get_input_slots(self) -> dict[str, type]:
+    def get_input_slots(self) -> Mapping[str, type]:
         assert False
 
     # Get description of output slots
     @abstractmethod
-    def get_output_slots(self) -> dict[str, type]:
+    def get_output_slots(self) -> Mapping[str, type]:
         assert False
 
     # Check if the procedure needs run to update outputs
@@ -65,10 +79,15 @@ class CalculatorMeta(StatusMeta):
             namespace: dict[str, Any], **kwargs: Any) -> type:
         input_slots, input_names = cls._get_fields(class_name, namespace, "INPUTS")
         output_slots, output_names = cls._get_fields(class_name, namespace, "OUTPUTS")
-        namespace["__input_slots"] = input_slots
-        namespace["__output_slots"] = output_slots
-        namespace["__input_names"] = input_names
-        namespace["__output_names"] = output_names
+        namespace["_input_slots_"] = MappingProxyType(input_slots)
+        namespace["_output_slots_"] = MappingProxyType(output_slots)
+        namespace["_input_names_"] = input_names
+        namespace["_output_names_"] = output_names
+        namespace["_output_getters_"] = \
+            {slot: attrgetter(name) for slot, name in output_names.items()}
+        namespace["_input_specs_"] = {
+            slot: (data_type, input_names[slot], 1 << i)
+            for i, (slot, data_type) in enumerate(input_slots.items())}
         return super().__new__(cls, class_name, bases, namespace, **kwargs)
 
     @staticmethod
@@ -79,17 +98,17 @@ class CalculatorMeta(StatusMeta):
         annotations = namespace["__annotations__"]
         types = dict[str, type]()
         names = dict[str, str]()
-        for slot in namespace[key]:
+        for slot in map(sys.intern, namespace[key]):
             if slot in annotations:
                 types[slot] = annotations[slot]
                 names[slot] = slot
                 continue
-            protected_field = f"_{slot}"
+            protected_field = sys.intern(f"_{slot}")
             if protected_field in annotations:
                 types[slot] = annotations[protected_field]
                 names[slot] = protected_field
                 continue
-            private_field = f"_{class_name}__{slot}"
+            private_field = sys.intern(f"_{class_name}__{slot}")
             if private_field in annotations:
                 types[slot] = annotations[private_field]
                 names[slot] = private_field
@@ -98,29 +117,39 @@ class CalculatorMeta(StatusMeta):
 
 
 # Procedure that calculates outputs using custom algorithm
+# Set `MEMO_SIZE` in child class to remember outputs calculated
+# for that many recent input combinations and skip `calculate`
+# when inputs repeat (inputs must be hashable for that).
+# Inputs repeat if they are equal, have the same types
+# and the same signs of zero (see `_zero_signs`).
 class Calculator(Procedure, metaclass=CalculatorMeta):
 
-    __missing_inputs: set[str]
-    __needs_run: bool
-    
-    def __get_input_slots(self) -> dict[str, type]:
-        return getattr(self, "__input_slots")
+    __slots__ = ("__missing_inputs", "__needs_run", "__memo")
 
-    def __get_output_slots(self) -> dict[str, type]:
-        return getattr(self, "__output_slots")
+    MEMO_SIZE: int = 0
 
-    def __set(self, slot: str, value: Any) -> None:
-        setattr(self, getattr(self, "__input_names")[slot], value)
+    # Set by `CalculatorMeta` for each class
+    _input_slots_: Mapping[str, type]
+    _output_slots_: Mapping[str, type]
+    _input_names_: dict[str, str]
+    _output_names_: dict[str, str]
+    _output_getters_: dict[str, Callable[[Any], Any]]
+    # Type, field name and missing input bit of each input slot
+    _input_specs_: dict[str, tuple[type, str, int]]
 
-    def __get(self, slot: str) -> Any:
-        return getattr(self, getattr(self, "__output_names")[slot])
+    # Bit mask of input slots without values (see `_input_specs_`)
+    __missing_inputs: int
+    __needs_run: bool
+    # Outputs by inputs of recent runs, latest last
+    __memo: Optional[OrderedDict[tuple[Any, ...], tuple[Any, ...]]]
 
     
     # CONSTRUCTOR
     def __init__(self) -> None:
         super().__init__()
-        self.__missing_inputs = set(self.__get_input_slots().keys())
+        self.__missing_inputs = (1 << len(self._input_specs_)) - 1
         self.__needs_run = True
+        self.__memo = OrderedDict() if self.MEMO_SIZE > 0 else None
 
 
     # COMMANDS
@@ -133,19 +162,21 @@ class Calculator(Procedure, metaclass=CalculatorMeta):
     @final
     @status("OK", "INVALID_SLOT", "INVALID_TYPE", "INVALID_VALUE")
     def put(self, slot: str, value: Any) -> None:
-        input_slots = self.__get_input_slots()
-        if slot not in input_slots:
+        spec = self._input_specs_.get(slot)
+        if spec is None:
             self._set_status("put", "INVALID_SLOT")
             return
-        if not _type_fits(type(value), input_slots[slot]):
+        data_type, name, bit = spec
+        value_type = type(value)
+        if value_type is not data_type \
+                and not _type_fits(value_type, data_type):
             self._set_status("put", "INVALID_TYPE")
             return
         if not self._is_valid_value(slot, value):
             self._set_status("put", "INVALID_VALUE")
             return
-        self.__set(slot, value)
-        if slot in self.__missing_inputs:
-            self.__missing_inputs.remove(slot)
+        setattr(self, name, value)
+        self.__missing_inputs &= ~bit
         self.__needs_run = True
         self._set_status("put", "OK")
 
@@ -156,13 +187,27 @@ class Calculator(Procedure, metaclass=CalculatorMeta):
     @final
     @status("OK", "INVALID_INPUT", "RUN_FAILED")
     def run(self) -> None:
-        if len(self.__missing_inputs) > 0:
+        if self.__missing_inputs:
             self._set_status("run", "INVALID_INPUT")
             return
+        memo = self.__memo
+        key = None if memo is None else self.__get_memo_key()
+        if key is not None and key in memo:
+            memo.move_to_end(key)
+            for name, value in zip(self._output_names_.values(), memo[key]):
+                setattr(self, name, value)
+            self.__needs_run = False
+            self._set_status("run", "OK")
+            return
         self.calculate()
         if not self.is_status("calculate", "OK"):
             self._set_status("run", "RUN_FAILED")
             return
+        if key is not None:
+            memo[key] = tuple(getattr(self, name) \
+                for name in self._output_names_.values())
+            if len(memo) > self.MEMO_SIZE:
+                memo.popitem(last=False)
         self.__needs_run = False
         self._set_status("run", "OK")
 
@@ -178,12 +223,12 @@ class Calculator(Procedure, metaclass=CalculatorMeta):
     # QUERIES
 
     # Get description of input slots
-    def get_input_slots(self) -> dict[str, type]:
-        return self.__get_input_slots()
+    def get_input_slots(self) -> Mapping[str, type]:
+        return self._input_slots_
 
     # Get description of output slots
-    def get_output_slots(self) -> dict[str, type]:
-        return self.__get_output_slots()
+    def get_output_slots(self) -> Mapping[str, type]:
+        return self._output_slots_
 
     # Check if the procedure needs run to update outputs
     def needs_run(self) -> bool:
@@ -194,20 +239,33 @@ class Calculator(Procedure, metaclass=CalculatorMeta):
     # PRE: run was successful after last input change
     @status("OK", "INVALID_SLOT", "NEEDS_RUN")
     def get(self, slot: str) -> Any:
-        output_slots = self.__get_output_slots()
-        if slot not in output_slots:
+        getter = self._output_getters_.get(slot)
+        if getter is None:
             self._set_status("get", "INVALID_SLOT")
             return
         if self.needs_run():
             self._set_status("get", "NEEDS_RUN")
             return
         self._set_status("get", "OK")
-        return self.__get(slot)
+        return getter(self)
 
     # Check input value
     def _is_valid_value(self, slot: str, value: Any) -> bool:
         assert False
 
+    # Get input values with their types and signs of zero as memo key
+    # or `None` if values are not hashable
+    def __get_memo_key(self) -> Optional[tuple[Any, ...]]:
+        values = tuple(getattr(self, name)
+            for name in self._input_names_.values())
+        key = values + tuple((type(value), _zero_signs(value))
+            for value in values)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
 
 Input = TypeVar("Input")
 Output = TypeVar("Output")
@@ -220,8 +278,14 @@ Output = TypeVar("Output")
 #   - status (valid or not)
 class Node(Generic[Input, Output], Status):
 
-    __inputs: set[Input]
-    __outputs: set[Output]
+    __slots__ = ("__inputs", "__outputs", "__input_tuple", "__output_tuple",
+        "__single_input", "__single_output", "__is_valid")
+
+    __inputs: list[Input]
+    __outputs: list[Output]
+    # Snapshots of links returned by queries (`None` if links changed)
+    __input_tuple: Optional[tuple[Input, ...]]
+    __output_tuple: Optional[tuple[Output, ...]]
     __single_input: bool
     __single_output: bool
     __is_valid: bool
@@ -233,8 +297,10 @@ class Node(Generic[Input, Output], Status):
     # POST: node is invalid
     def __init__(self, single_input: bool, single_output: bool) -> None:
         Status.__init__(self)
-        self.__inputs = set()
-        self.__outputs = set()
+        self.__inputs = []
+        self.__outputs = []
+        self.__input_tuple = None
+        self.__output_tuple = None
         self.__single_input = single_input
         self.__single_output = single_output
         self.__is_valid = False
@@ -254,7 +320,8 @@ class Node(Generic[Input, Output], Status):
         if self.__single_input and len(self.__inputs) > 0:
             self._set_status("add_input", "TOO_MANY_LINKS")
             return
-        self.__inputs.add(input)
+        self.__inputs.append(input)
+        self.__input_tuple = None
         self._set_status("add_input", "OK")
 
     # Add output node
@@ -269,7 +336,8 @@ class Node(Generic[Input, Output], Status):
         if self.__single_output and len(self.__outputs) > 0:
             self._set_status("add_output", "TOO_MANY_LINKS")
             return
-        self.__outputs.add(output)
+        self.__outputs.append(output)
+        self.__output_tuple = None
         self._set_status("add_output", "OK")
 
     # Mark node as valid
@@ -283,33 +351,59 @@ class Node(Generic[Input, Output], Status):
     
     # QUERIES
 
-    # Get input
-    def get_inputs(self) -> set[Input]:
-        return self.__inputs.copy()
+    # Get inputs
+    def get_inputs(self) -> tuple[Input, ...]:
+        if self.__input_tuple is None:
+            self.__input_tuple = tuple(self.__inputs)
+        return self.__input_tuple
 
     # Get outputs
-    def get_outputs(self) -> set[Output]:
-        return self.__outputs.copy()
+    def get_outputs(self) -> tuple[Output, ...]:
+        if self.__output_tuple is None:
+            self.__output_tuple = tuple(self.__outputs)
+        return self.__output_tuple
+
+    # Get the only input
+    # PRE: there is exactly one input
+    def get_single_input(self) -> Input:
+        assert len(self.__inputs) == 1
+        return self.__inputs[0]
+
+    # Get the only output
+    # PRE: there is exactly one output
+    def get_single_output(self) -> Output:
+        assert len(self.__outputs) == 1
+        return self.__outputs[0]
 
     # Check node status
     def is_valid(self) -> bool:
         return self.__is_valid
 
 
-# Slot mixin for nodes
+# Base node class for named slots of Composition
+# INHERITED:
+#   - inputs (may be limited to single)
+#   - outputs (may be limited to single)
+#   - status (valid or not)
 # CONTAINS:
 #   - slot id
 #   - data type
-class SlotMixin(Status):
+class SlotNode(Node[Input, Output]):
+
+    __slots__ = ("__slot", "__type")
 
     __slot: str
     __type: type
 
     # CONSTRUCTOR
+    # POST: no inputs
+    # POST: no outputs
+    # POST: node is invalid
     # POST: slot id is `slot`
     # POST: data type is `data_type`
-    def __init__(self, slot: str, data_type: type) -> None:
-        Status.__init__(self)
+    def __init__(self, single_input: bool, single_output: bool,
+            slot: str, data_type: type) -> None:
+        super().__init__(single_input, single_output)
         self.__slot = slot
         self.__type = data_type
 
@@ -331,7 +425,9 @@ class SlotMixin(Status):
 #   - up to one output ProcNode
 #   - slot id
 #   - data type
-class InputNode(Node["OutputNode", "ProcNode"], SlotMixin):
+class InputNode(SlotNode["OutputNode", "ProcNode"]):
+
+    __slots__ = ()
 
     # CONSTRUCTOR
     # POST: no input
@@ -339,8 +435,7 @@ class InputNode(Node["OutputNode", "ProcNode"], SlotMixin):
     # POST: slot id is `slot`
     # POST: data type is `data_type`
     def __init__(self, slot: str, data_type: type) -> None:
-        Node.__init__(self, True, True)
-        SlotMixin.__init__(self, slot, data_type)
+        super().__init__(True, True, slot, data_type)
 
 
 # Output slot node for Composition
@@ -349,7 +444,9 @@ class InputNode(Node["OutputNode", "ProcNode"], SlotMixin):
 #   - outputs (InputNode)
 #   - slot id
 #   - data type
-class OutputNode(Node["ProcNode", "InputNode"], SlotMixin):
+class OutputNode(SlotNode["ProcNode", "InputNode"]):
+
+    __slots__ = ()
 
     # CONSTRUCTOR
     # POST: no input
@@ -357,8 +454,7 @@ class OutputNode(Node["ProcNode", "InputNode"], SlotMixin):
     # POST: slot id is `slot`
     # POST: data type is `data_type`
     def __init__(self, slot: str, data_type: type) -> None:
-        Node.__init__(self, True, False)
-        SlotMixin.__init__(self, slot, data_type)
+        super().__init__(True, False, slot, data_type)
 
 
 # Slot node for Composition
@@ -368,6 +464,8 @@ class OutputNode(Node["ProcNode", "InputNode"], SlotMixin):
 #   - procedure
 class ProcNode(Node[InputNode, OutputNode]):
 
+    __slots__ = ("__proc",)
+
     __proc: Procedure
 
     # CONSTRUCTOR
@@ -385,209 +483,459 @@ class ProcNode(Node[InputNode, OutputNode]):
         return self.__proc
 
 
-def _invalidate_node(node: InputNode | OutputNode | ProcNode):
-    if not node.is_valid():
-        return
-    node.invalidate()
-    for output in node.get_outputs():
-        _invalidate_node(output)
-
-
 @final
 class Composition(Procedure):
 
-    __input_nodes: dict[str, set[InputNode]]
+    __slots__ = ("__input_nodes", "__output_nodes", "__proc_bits",
+        "__procs_to_run", "__input_bits", "__missing_inputs",
+        "__schedule", "__layers", "__input_values",
+        "__output_values", "__output_readers", "__output_procs",
+        "__input_slots", "__output_slots", "__input_slots_view",
+        "__output_slots_view")
+
+    __input_nodes: dict[str, tuple[tuple[InputNode, ProcNode, int], ...]]
     __output_nodes: dict[str, OutputNode]
+    # Each procedure node has its own bit in `__procs_to_run` mask
+    __proc_bits: dict[ProcNode, int]
+    # Bit mask of procedures with changed inputs
+    __procs_to_run: int
+    # Each input slot has its own bit in `__missing_inputs` mask
+    __input_bits: dict[str, int]
+    # Bit mask of input slots that never got a value
+    __missing_inputs: int
+    __input_values: dict[str, Any]
+    __output_values: dict[OutputNode, Any]
+    # Reader of each output and mask of procedures it depends on
+    __output_readers: dict[str, tuple[Callable[[], Any], int]]
+    # Mask of procedures required to calculate outputs
+    __output_procs: int
+    __schedule: Optional[tuple["Composition._Step", ...]]
+    __layers: Optional[tuple[tuple["Composition._Step", ...], ...]]
     __input_slots: dict[str, type]
     __output_slots: dict[str, type]
-    __needs_run: bool
+    __input_slots_view: Mapping[str, type]
+    __output_slots_view: Mapping[str, type]
 
     ProcDescr = tuple[Procedure, dict[str, str], dict[str, str]]
+    # Output node, its reader and destinations
+    _Wire = tuple[OutputNode, Callable[[], Any],
+        tuple[tuple[InputNode, ProcNode, int], ...]]
+    # Procedure node, its bit, mask of its input slots and output wires
+    _Step = tuple[ProcNode, int, int, tuple[_Wire, ...]]
     
     # CONSTRUCTOR
+    # If `outputs` is given only these names are output slots
+    # and procedures not required to calculate them never run
     @status("OK", "ERROR", name="init")
-    def __init__(self, contents: list[ProcDescr]) -> None:
+    def __init__(self, contents: list[ProcDescr],
+            outputs: Optional[Iterable[str]] = None) -> None:
         super().__init__()
-        self.__needs_run = True
         self._set_status("init", "OK")
 
-        input_nodes = dict[str, set[InputNode]]()
-        output_nodes = dict[str, OutputNode]()
-        procedures = set[ProcNode]()
-        
-        for proc, proc_inputs, proc_outputs in contents:
-            proc_node = ProcNode(proc)
-            procedures.add(proc_node)
-            proc_input_slots = proc.get_input_slots()
-            proc_output_slots = proc.get_output_slots()
-
-            for slot, name in proc_inputs.items():
-                if name not in input_nodes:
-                    input_nodes[name] = set()
-                input_node = InputNode(slot, proc_input_slots[slot])
-                input_nodes[name].add(input_node)
-                input_node.add_output(proc_node)
-                proc_node.add_input(input_node)
-
-            for slot, name in proc_outputs.items():
-                output_node = OutputNode(slot, proc_output_slots[slot])
-                output_nodes[name] = output_node
-                proc_node.add_output(output_node)
-                output_node.add_input(proc_node)
-                if name not in output_nodes:
-                    output_nodes[name] = OutputNode(slot, proc_output_slots[slot])
-                output_node = output_nodes[name]
-                assert _type_fits(proc_output_slots[slot], output_node.get_type())
-
-        internal_names = set[str]()
-        for name, output_node in output_nodes.items():
-            if name not in input_nodes:
-                continue
-            for input_node in input_nodes[name]:
-                output_node.add_output(input_node)
-                input_node.add_input(output_node)
-                assert _type_fits(output_node.get_type(), input_node.get_type())
-            internal_names.add(name)
-        for name in internal_names:
-            del input_nodes[name]
-            del output_nodes[name]
-
-        self.__input_nodes = input_nodes
-        self.__output_nodes = output_nodes
-        
+        input_nodes, output_nodes, proc_nodes = _build_nodes(contents)
+        if outputs is not None:
+            output_nodes = _select_outputs(output_nodes, outputs)
+
+        self.__proc_bits = \
+            {node: 1 << i for i, node in enumerate(proc_nodes)}
+        self.__procs_to_run = (1 << len(proc_nodes)) - 1
+        self.__input_nodes = dict()
         self.__input_slots = dict[str, type]()
+        self.__input_bits = \
+            {name: 1 << i for i, name in enumerate(input_nodes)}
+        self.__missing_inputs = (1 << len(input_nodes)) - 1
         for name, nodes in input_nodes.items():
-            t = _type_intersection([node.get_type() for node in nodes])
+            self.__input_nodes[name] = \
+                _with_dest_procs(nodes, self.__proc_bits)
+            t = _type_intersection(tuple(node.get_type() for node in nodes))
             assert t
             self.__input_slots[name] = t
+        self.__output_nodes = output_nodes
+        self.__output_readers = dict()
+        self.__output_procs = 0
         self.__output_slots = dict[str, type]()
-        for name, node in output_nodes.items():
-            self.__output_slots[name] = node.get_type()
+        for name, output_node in output_nodes.items():
+            procs_mask = _get_source_procs(output_node, self.__proc_bits)
+            self.__output_readers[name] = (_output_reader(
+                output_node.get_single_input().get_proc(),
+                output_node.get_slot()), procs_mask)
+            self.__output_procs |= procs_mask
+            self.__output_slots[name] = output_node.get_type()
+        self.__input_values = dict()
+        self.__output_values = dict()
+        self.__schedule = None
+        self.__layers = None
+        self.__input_slots_view = MappingProxyType(self.__input_slots)
+        self.__output_slots_view = MappingProxyType(self.__output_slots)
 
     
     # COMMANDS
 
     # Set input value
+    # Putting the value equal to the current one (see `_is_same_value`)
+    # changes nothing, so mutable values modified in place
+    # must be put as new objects to take effect.
     # PRE: `slot` is valid input slot name
     # PRE: type of `value` is compatible with slot
     # PRE: `value` is acceptable for the procedure
     # POST: input value in slot `slot` is set to `value`
     @status("OK", "INVALID_SLOT", "INVALID_TYPE", "INVALID_VALUE")
     def put(self, slot: str, value: Any) -> None:
-        if slot not in self.__input_slots:
+        input_values = self.__input_values
+        data_type = self.__input_slots.get(slot)
+        if data_type is None:
             self._set_status("put", "INVALID_SLOT")
             return
-        if not _type_fits(type(value), self.__input_slots[slot]):
+        value_type = type(value)
+        if value_type is not data_type \
+                and not _type_fits(value_type, data_type):
             self._set_status("put", "INVALID_TYPE")
             return
-        for input_node in self.__input_nodes[slot]:
-            self.__put_data(input_node, value)
-            if not self.is_status("put_data", "OK"):
-                self._set_status("put", self.get_status("put_data"))
+        old_value = input_values.get(slot, _NO_VALUE)
+        if old_value is not _NO_VALUE and _is_same_value(old_value, value):
+            self._set_status("put", "OK")
+            return
+        input_values.pop(slot, None)
+        for input_node, proc_node, proc_bit in self.__input_nodes[slot]:
+            if not self.__put_data(input_node, proc_node, proc_bit, value):
+                self._set_status("put", "INVALID_VALUE")
                 return
-        self.__needs_run = True
+        input_values[slot] = value
+        self.__missing_inputs &= ~self.__input_bits[slot]
         self._set_status("put", "OK")
 
 
     # Run procedure
+    # Only procedures with changed inputs are run.
+    # Internal value that is the same as the one passed on the previous run
+    # (see `_is_same_value`) is not passed on again, so procedures
+    # must produce new objects for changed outputs.
     # PRE: procedure can run successfully with current inputs
     # POST: output values are set
     # POST: input values status set to unchanged
     @status("OK", "INVALID_INPUT", "RUN_FAILED")
     def run(self) -> None:
-        for _, node in self.__output_nodes.items():
-            self.__validate_output_node(node)
-        self.__needs_run = False
+        if self.__schedule is None:
+            self.__build_schedule()
+        assert self.__schedule is not None
+        for proc_node, proc_bit, inputs_mask, wires in self.__schedule:
+            if not self.__procs_to_run & proc_bit:
+                continue
+            if self.__missing_inputs & inputs_mask:
+                self._set_status("run", "INVALID_INPUT")
+                return
+            proc = proc_node.get_proc()
+            proc.run()
+            if not proc.is_status("run", "OK"):
+                self._set_status("run", "RUN_FAILED")
+                return
+            if not self.__pass_outputs(wires):
+                self._set_status("run", "RUN_FAILED")
+                return
+            self.__procs_to_run &= ~proc_bit
         self._set_status("run", "OK")
 
-    
-    @status("OK", "INVALID_VALUE", name="put_data")
-    def __put_data(self, input_node: InputNode, value: Any) -> None:
-        assert len(input_node.get_outputs()) == 1
-        proc_node = next(iter(input_node.get_outputs()))
-        proc = proc_node.get_proc()
-        proc.put(input_node.get_slot(), value)
-        if proc.is_status("put", "INVALID_VALUE"):
-            self._set_status("put_data", "INVALID_VALUE")
-            return
-        assert proc.is_status("put", "OK")
-        input_node.validate()
-        _invalidate_node(proc_node)
-        self._set_status("put_data", "OK")
-
+    # Run procedure running independent inner procedures concurrently
+    # Procedures of each layer (see `_get_run_layers`) are submitted
+    # to `executor` together and their outputs are passed on
+    # when all of them finish.
+    # Useful with thread pools for procedures that release GIL or wait for IO.
+    # PRE: inner procedures can run in parallel threads of `executor`
+    # PRE: procedure can run successfully with current inputs
+    # POST: output values are set
+    # POST: input values status set to unchanged
+    @status("OK", "INVALID_INPUT", "RUN_FAILED")
+    def run_parallel(self, executor: Executor) -> None:
+        if self.__layers is None:
+            self.__build_schedule()
+        assert self.__layers is not None
+        for layer in self.__layers:
+            steps = [step for step in layer if self.__procs_to_run & step[1]]
+            for _, _, inputs_mask, _ in steps:
+                if self.__missing_inputs & inputs_mask:
+                    self._set_status("run_parallel", "INVALID_INPUT")
+                    return
+            procs = [step[0].get_proc() for step in steps]
+            for future in [executor.submit(proc.run) for proc in procs]:
+                future.result()
+            for proc in procs:
+                if not proc.is_status("run", "OK"):
+                    self._set_status("run_parallel", "RUN_FAILED")
+                    return
+            for _, proc_bit, _, wires in steps:
+                if not self.__pass_outputs(wires):
+                    self._set_status("run_parallel", "RUN_FAILED")
+                    return
+                self.__procs_to_run &= ~proc_bit
+        self._set_status("run_parallel", "OK")
 
-    def __validate_output_node(self, output_node: OutputNode) -> None:
-        if output_node.is_valid():
-            return
-        assert len(output_node.get_inputs()) == 1
-        proc_node = next(iter(output_node.get_inputs()))
-        self.__validate_proc_node(proc_node)
-        output_node.validate()
+    
+    # Build run order of procedures with their output wiring
+    # Done on first run so that compositions that never run
+    # do not pay for it.
+    # Only external inputs are checked on run (see `__missing_inputs`):
+    # internal ones are set by the procedures that come earlier
+    # in the schedule (a procedure is marked as done only after
+    # all its outputs are passed on).
+    def __build_schedule(self) -> None:
+        proc_bits = self.__proc_bits
+        input_node_bits = {input_node: self.__input_bits[name] \
+            for name, dests in self.__input_nodes.items() \
+            for input_node, _, _ in dests}
+        layers = list[tuple[Composition._Step, ...]]()
+        for layer in _get_run_layers(self.__output_nodes.values()):
+            steps = list[Composition._Step]()
+            for proc_node in layer:
+                inputs_mask = 0
+                for input_node in proc_node.get_inputs():
+                    inputs_mask |= input_node_bits.get(input_node, 0)
+                proc = proc_node.get_proc()
+                wires = tuple(
+                    (output_node,
+                        _output_reader(proc, output_node.get_slot()),
+                        _with_dest_procs(output_node.get_outputs(), proc_bits))
+                    for output_node in proc_node.get_outputs()
+                    if len(output_node.get_outputs()) > 0)
+                steps.append(
+                    (proc_node, proc_bits[proc_node], inputs_mask, wires))
+            layers.append(tuple(steps))
+        self.__layers = tuple(layers)
+        self.__schedule = tuple(step for layer in layers for step in layer)
+
+    # Pass changed outputs of procedure to their destinations
+    # Returns `False` if some destination does not accept the value
+    def __pass_outputs(self, wires: tuple[_Wire, ...]) -> bool:
+        output_values = self.__output_values
+        for output_node, read_output, dest_nodes in wires:
+            value = read_output()
+            if output_node in output_values \
+                    and _is_same_value(output_values[output_node], value):
+                continue
+            output_values.pop(output_node, None)
+            for dest_node, dest_proc_node, dest_bit in dest_nodes:
+                if not self.__put_data(
+                        dest_node, dest_proc_node, dest_bit, value):
+                    return False
+            output_values[output_node] = value
+        return True
 
 
-    def __validate_proc_node(self, proc_node: ProcNode):
-        if proc_node.is_valid():
-            return
-        for input_node in proc_node.get_inputs():
-            self.__validate_input_node(input_node)
+    # Put value to inner procedure input and mark the procedure to run
+    # Returns `False` if the procedure does not accept the value
+    def __put_data(self, input_node: InputNode, proc_node: ProcNode,
+            proc_bit: int, value: Any) -> bool:
+        assert proc_node in input_node.get_outputs()
         proc = proc_node.get_proc()
-        proc.run()
-        proc_node.validate()
-        for output_node in proc_node.get_outputs():
-            value = self.__get_data(output_node)
-            for dest_node in output_node.get_outputs():
-                self.__put_data(dest_node, value)
-
-
-    def __validate_input_node(self, input_node: InputNode) -> None:
-        if input_node.is_valid():
-            return
-        assert len(input_node.get_inputs()) == 1
-        source_node = next(iter(input_node.get_inputs()))
-        self.__validate_output_node(source_node)
+        proc.put(input_node.get_slot(), value)
+        if not proc.is_status("put", "OK"):
+            assert proc.is_status("put", "INVALID_VALUE")
+            return False
         input_node.validate()
-
-
-    def __get_data(self, output_node: OutputNode) -> Any:
-        assert len(output_node.get_inputs()) == 1
-        proc_node = next(iter(output_node.get_inputs()))
-        proc = proc_node.get_proc()
-        value = proc.get(output_node.get_slot())
-        assert proc.is_status("get", "OK")
-        return value
+        self.__procs_to_run |= proc_bit
+        return True
 
 
     # QUERIES
 
     # Get description of input slots
-    def get_input_slots(self) -> dict[str, type]:
-        return self.__input_slots.copy()
+    def get_input_slots(self) -> Mapping[str, type]:
+        return self.__input_slots_view
 
     # Get description of output slots
-    def get_output_slots(self) -> dict[str, type]:
-        return self.__output_slots.copy()
+    def get_output_slots(self) -> Mapping[str, type]:
+        return self.__output_slots_view
 
     # Check if the procedure needs run to update outputs
+    # Procedures that do not affect outputs are ignored.
     def needs_run(self) -> bool:
-        return self.__needs_run
+        return self.__procs_to_run & self.__output_procs != 0
 
     # Get output value
+    # Output is available if procedures it depends on have no changed inputs
+    # even if other outputs need run.
     # PRE: slot is valid output slot name
-    # PRE: run was successful after last input change
+    # PRE: run was successful after last change of inputs the output depends on
     @status("OK", "INVALID_SLOT", "NEEDS_RUN")
     def get(self, slot: str) -> Any:
-        if slot not in self.__output_nodes:
+        reader = self.__output_readers.get(slot)
+        if reader is None:
             self._set_status("get", "INVALID_SLOT")
             return None
-        if self.needs_run():
+        read_output, procs_mask = reader
+        if self.__procs_to_run & procs_mask:
             self._set_status("get", "NEEDS_RUN")
             return None
-        output_node = self.__output_nodes[slot]
-        value = self.__get_data(output_node)
         self._set_status("get", "OK")
-        return value
+        return read_output()
 
 
+# Build nodes of procedures described in `contents` and link them by names
+# Returns input and output nodes of composition and all procedure nodes
+def _build_nodes(contents: list[Composition.ProcDescr]
+        ) -> tuple[dict[str, set[InputNode]], dict[str, OutputNode],
+            list[ProcNode]]:
+    input_nodes = dict[str, set[InputNode]]()
+    output_nodes = dict[str, OutputNode]()
+    proc_nodes = list[ProcNode]()
+    
+    for proc, proc_inputs, proc_outputs in contents:
+        proc_node = ProcNode(proc)
+        proc_nodes.append(proc_node)
+        proc_input_slots = proc.get_input_slots()
+        proc_output_slots = proc.get_output_slots()
+
+        for slot, name in proc_inputs.items():
+            slot, name = sys.intern(slot), sys.intern(name)
+            input_node = InputNode(slot, proc_input_slots[slot])
+            input_nodes.setdefault(name, set()).add(input_node)
+            input_node.add_output(proc_node)
+            proc_node.add_input(input_node)
+
+        for slot, name in proc_outputs.items():
+            slot, name = sys.intern(slot), sys.intern(name)
+            assert name not in output_nodes, f"Duplicate output '{name}'"
+            output_node = OutputNode(slot, proc_output_slots[slot])
+            output_nodes[name] = output_node
+            proc_node.add_output(output_node)
+            output_node.add_input(proc_node)
+
+    internal_names = input_nodes.keys() & output_nodes.keys()
+    for name in internal_names:
+        output_node = output_nodes[name]
+        for input_node in input_nodes[name]:
+            output_node.add_output(input_node)
+            input_node.add_input(output_node)
+            assert _type_fits(output_node.get_type(), input_node.get_type())
+    external_inputs = {name: nodes for name, nodes in input_nodes.items() \
+        if name not in internal_names}
+    external_outputs = {name: node for name, node in output_nodes.items() \
+        if name not in internal_names}
+    return external_inputs, external_outputs, proc_nodes
+
+
+# Get output nodes with names from `names` only
+def _select_outputs(output_nodes: dict[str, OutputNode], names: Iterable[str]
+        ) -> dict[str, OutputNode]:
+    selected = dict[str, OutputNode]()
+    for name in map(sys.intern, names):
+        assert name in output_nodes, f"Unknown output '{name}'"
+        selected[name] = output_nodes[name]
+    return selected
+
+
+# Pair input nodes with the procedure nodes they feed and their bits
+# Used to resolve data destinations once instead of on every transfer
+def _with_dest_procs(input_nodes: Iterable[InputNode],
+        proc_bits: dict[ProcNode, int]
+        ) -> tuple[tuple[InputNode, ProcNode, int], ...]:
+    dests = list[tuple[InputNode, ProcNode, int]]()
+    for input_node in input_nodes:
+        proc_node = input_node.get_single_output()
+        dests.append((input_node, proc_node, proc_bits[proc_node]))
+    return tuple(dests)
+
+
+# Get function that reads output `slot` of `proc` after successful run
+# Calculator fields are read directly without `get` status bookkeeping
+def _output_reader(proc: Procedure, slot: str) -> Callable[[], Any]:
+    if isinstance(proc, Calculator):
+        return partial(proc._output_getters_[slot], proc)
+    def read() -> Any:
+        value = proc.get(slot)
+        assert proc.is_status("get", "OK")
+        return value
+    return read
+
+
+# Get mask of procedures required to calculate `output_node`
+def _get_source_procs(output_node: OutputNode,
+        proc_bits: dict[ProcNode, int]) -> int:
+    mask = 0
+    stack = list(output_node.get_inputs())
+    while stack:
+        proc_node = stack.pop()
+        bit = proc_bits[proc_node]
+        if mask & bit:
+            continue
+        mask |= bit
+        for input_node in proc_node.get_inputs():
+            for source_node in input_node.get_inputs():
+                stack.extend(source_node.get_inputs())
+    return mask
+
+
+# Get procedure nodes required to validate `output_nodes`
+# grouped in layers that must run in order (each one after all its sources)
+# Procedures of the same layer do not depend on each other
+def _get_run_layers(output_nodes: Iterable[OutputNode]
+        ) -> list[list[ProcNode]]:
+    required = set[ProcNode]()
+    stack = list[ProcNode]()
+    for output_node in output_nodes:
+        stack.extend(output_node.get_inputs())
+    while stack:
+        proc_node = stack.pop()
+        if proc_node in required:
+            continue
+        required.add(proc_node)
+        for input_node in proc_node.get_inputs():
+            for source_node in input_node.get_inputs():
+                stack.extend(source_node.get_inputs())
+    pending_sources = dict[ProcNode, int]()
+    for proc_node in required:
+        pending_sources[proc_node] = sum(len(input_node.get_inputs()) \
+            for input_node in proc_node.get_inputs())
+    ready = [node for node, count in pending_sources.items() if count == 0]
+    layers = list[list[ProcNode]]()
+    layered_count = 0
+    while ready:
+        layers.append(ready)
+        layered_count += len(ready)
+        next_ready = list[ProcNode]()
+        for proc_node in ready:
+            for output_node in proc_node.get_outputs():
+                for input_node in output_node.get_outputs():
+                    for dest_node in input_node.get_outputs():
+                        if dest_node not in pending_sources:
+                            continue
+                        pending_sources[dest_node] -= 1
+                        if pending_sources[dest_node] == 0:
+                            next_ready.append(dest_node)
+        ready = next_ready
+    assert layered_count == len(required), "Loops are not allowed"
+    return layers
+
+
+# Check if `new` value can be treated as unchanged `old` value
+# Values are same if they are identical or have the same type,
+# are equal and have the same signs of zero (see `_zero_signs`).
+# Values that cannot be compared to plain `bool` (e.g. arrays)
+# and NaN values that are not identical are always treated as changed.
+def _is_same_value(old: Any, new: Any) -> bool:
+    if old is new:
+        return True
+    if type(old) is not type(new):
+        return False
+    try:
+        if not bool(old == new):
+            return False
+    except Exception:
+        return False
+    return _zero_signs(old) == _zero_signs(new)
+
+
+# Get signs of float or complex number parts (`None` for other values)
+# Equal numbers `0.0` and `-0.0` give different results in `1 / x`,
+# `atan2` or `copysign`, so they must not be treated as the same value.
+def _zero_signs(value: Any) -> Any:
+    if isinstance(value, float):
+        return copysign(1.0, value)
+    if isinstance(value, complex):
+        return copysign(1.0, value.real), copysign(1.0, value.imag)
+    return None
+
+
+@lru_cache(maxsize=1024)
 def _type_fits(t: type, required: type) -> bool:
     if issubclass(t, required):
         return True
@@ -598,9 +946,12 @@ def _type_fits(t: type, required: type) -> bool:
     return False
 
 
-def _type_intersection(types: list[type]) -> Optional[type]:
+@lru_cache(maxsize=1024)
+def _type_intersection(types: tuple[type, ...]) -> Optional[type]:
     minor_type = types[0]
     for t in types[1:]:
+        if t is minor_type:
+            continue
         if _type_fits(minor_type, t):
             continue
         if not _type_fits(t, minor_type):
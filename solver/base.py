@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Mapping
+from functools import lru_cache
 
 from tools import Status, status
 
@@ -35,12 +36,12 @@ class Solver(Status):
     
     # Get input value ids and types
     @abstractmethod
-    def get_input_spec(self) -> dict[str, type]:
+    def get_input_spec(self) -> Mapping[str, type]:
         assert False
 
     # Get output value ids and types
     @abstractmethod
-    def get_output_spec(self) -> dict[str, type]:
+    def get_output_spec(self) -> Mapping[str, type]:
         assert False
 
     # Check if input or output value is set
@@ -75,15 +76,16 @@ class SolverFactory(ABC):
 
     # Get solver input value ids and types
     @abstractmethod
-    def get_input_spec(self) -> dict[str, type]:
+    def get_input_spec(self) -> Mapping[str, type]:
         assert False
 
     # Get solver output value ids and types
     @abstractmethod
-    def get_output_spec(self) -> dict[str, type]:
+    def get_output_spec(self) -> Mapping[str, type]:
         assert False
 
 
+@lru_cache(maxsize=512)
 def is_subtype(t: type, required: type) -> bool:
     if issubclass(t, required):
         return True
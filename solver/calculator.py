@@ -1,5 +1,6 @@
 from abc import abstractmethod
-from typing import Any, TypeVar, Type, Generic, get_origin, get_args
+from typing import Any, TypeVar, Type, Generic, Optional, \
+    get_origin, get_args
 
 from tools import Status, status, StatusMeta
 from solver.base import Solver, is_subtype
@@ -15,6 +16,8 @@ T = TypeVar("T")
 #   - data type
 #   - data state (has data or not)
 class Input(Generic[T], Status):
+
+    __slots__ = ()
     
     # QUERIES
 
@@ -43,6 +46,8 @@ class Input(Generic[T], Status):
 #   - data type
 class Output(Generic[T], Status):
 
+    __slots__ = ()
+
     # COMMANDS
 
     # Set data
@@ -72,6 +77,8 @@ DataDest = Output[Any]
 #   - data type
 #   - data state (has data or not)
 class Slot(DataSource, DataDest):
+
+    __slots__ = ("__type", "__value", "__has_data")
     
     __type: type
     __value: Any
@@ -94,12 +101,23 @@ class Slot(DataSource, DataDest):
     # POST: data is `value`
     @status("OK", "INVALID_VALUE")
     def put(self, value: Any) -> None:
-        if not is_subtype(type(value), self.__type):
+        if not self._try_put(value):
             self._set_status("put", "INVALID_VALUE")
             return
         self._set_status("put", "OK")
+
+    # Set data without status update
+    # Used by calculators that report status themselves
+    # Returns `False` if `value` type does not fit data type
+    def _try_put(self, value: Any) -> bool:
+        data_type = self.__type
+        value_type = type(value)
+        if value_type is not data_type \
+                and not is_subtype(value_type, data_type):
+            return False
         self.__has_data = True
         self.__value = value
+        return True
 
 
     # QUERIES
@@ -122,6 +140,12 @@ class Slot(DataSource, DataDest):
         self._set_status("get", "OK")
         return self.__value
 
+    # Get data without status update
+    # Used by calculators that have already checked data state
+    # PRE: has data
+    def _get_unchecked(self) -> Any:
+        return self.__value
+
 
 class CalculatorMeta(StatusMeta):
     
@@ -129,10 +153,12 @@ class CalculatorMeta(StatusMeta):
             namespace: dict[str, Any], **kwargs: Any) -> type:
         inputs = cls.__get_fields(class_name, namespace, Input)
         outputs = cls.__get_fields(class_name, namespace, Output)
-        namespace["__input_fields"] = dict([(v[0], v[1]) for v in inputs])
-        namespace["__output_fields"] = dict([(v[0], v[1]) for v in outputs])
-        namespace["__input_types"] = dict([(v[0], v[2]) for v in inputs])
-        namespace["__output_types"] = dict([(v[0], v[2]) for v in outputs])
+        namespace["_input_fields_"] = {id: name for id, name, _ in inputs}
+        namespace["_output_fields_"] = {id: name for id, name, _ in outputs}
+        namespace["_input_types_"] = {id: t for id, _, t in inputs}
+        namespace["_output_types_"] = {id: t for id, _, t in outputs}
+        namespace["_input_bits_"] = \
+            {id: 1 << i for i, (id, _, _) in enumerate(inputs)}
         return super().__new__(cls, class_name, bases, namespace, **kwargs)
 
     @staticmethod
@@ -160,21 +186,40 @@ class CalculatorMeta(StatusMeta):
 
 class Calculator(Solver, metaclass=CalculatorMeta):
 
+    # Slots stored in `Input` and `Output` fields by id
+    __input_slots: dict[str, Slot]
+    __output_slots: dict[str, Slot]
+    # Bit mask of inputs without values (see `_input_bits_`)
+    __missing_inputs: int
+
+    # Set by `CalculatorMeta` for each class
+    _input_fields_: dict[str, str]
+    _output_fields_: dict[str, str]
+    _input_types_: dict[str, type]
+    _output_types_: dict[str, type]
+    # Each input has its own bit in `__missing_inputs` mask
+    _input_bits_: dict[str, int]
+
+
     # CONSTRUCTOR
     # POST: all `Input` and `Output` fields contain slots of specified types
     def __init__(self) -> None:
         super().__init__()
-        self.__make_slots(
-            getattr(self, "__input_fields"),
-            getattr(self, "__input_types"))
-        self.__make_slots(
-            getattr(self, "__output_fields"),
-            getattr(self, "__output_types"))
-
-    def __make_slots(self, fields: dict[str, str], types: dict[str, type]):
+        self.__input_slots = self.__make_slots(
+            self._input_fields_, self._input_types_)
+        self.__output_slots = self.__make_slots(
+            self._output_fields_, self._output_types_)
+        self.__missing_inputs = (1 << len(self._input_bits_)) - 1
+
+    def __make_slots(self, fields: dict[str, str], types: dict[str, type]
+            ) -> dict[str, Slot]:
         assert fields.keys() == types.keys()
+        slots = dict[str, Slot]()
         for id in fields.keys():
-            setattr(self, fields[id], Slot(types[id]))
+            slot = Slot(types[id])
+            setattr(self, fields[id], slot)
+            slots[id] = slot
+        return slots
 
 
     # COMMANDS
@@ -185,15 +230,14 @@ class Calculator(Solver, metaclass=CalculatorMeta):
     # POST: input `id` is equal to `value`
     @status("OK", "INVALID_ID", "INVALID_VALUE")
     def put(self, id: str, value: Any) -> None:
-        input_fields: dict[str, str] = getattr(self, "__input_fields")
-        if id not in input_fields:
+        input = self.__input_slots.get(id)
+        if input is None:
             self._set_status("put", "INVALID_ID")
             return
-        input: Slot = getattr(self, input_fields[id])
-        input.put(value)
-        if not input.is_status("put", "OK"):
+        if not input._try_put(value):
             self._set_status("put", "INVALID_VALUE")
             return
+        self.__missing_inputs &= ~self._input_bits_[id]
         self._set_status("put", "OK")
         return
 
@@ -204,17 +248,14 @@ class Calculator(Solver, metaclass=CalculatorMeta):
     # POST: output values are set
     @status("OK", "INVALID_INPUT", "INTERNAL_ERROR")
     def run(self) -> None:
-        for field_name in getattr(self, "__input_fields").values():
-            slot: Slot = getattr(self, field_name)
-            if not slot.has_value():
-                self._set_status("run", "INVALID_INPUT")
-                return
+        if self.__missing_inputs:
+            self._set_status("run", "INVALID_INPUT")
+            return
         self.calculate()
         if not self.is_status("calculate", "OK"):
             self._set_status("run", "INTERNAL_ERROR")
             return
-        for field_name in getattr(self, "__output_fields").values():
-            slot: Slot = getattr(self, field_name)
+        for slot in self.__output_slots.values():
             if not slot.has_value():
                 self._set_status("run", "INTERNAL_ERROR")
                 return
@@ -235,44 +276,41 @@ class Calculator(Solver, metaclass=CalculatorMeta):
     
     # Get input value ids and types
     def get_input_spec(self) -> dict[str, type]:
-        return getattr(self, "__input_types")
+        return self._input_types_
 
     # Get output value ids and types
     def get_output_spec(self) -> dict[str, type]:
-        return getattr(self, "__output_types")
+        return self._output_types_
 
     # Check if input or output value is set
     # PRE: `id` is valid input or output name
     @status("OK", "INVALID_ID")
     def has_value(self, id: str) -> bool:
-        input_fields: dict[str, str] = getattr(self, "__input_fields")
-        if id in input_fields:
-            self._set_status("has_value", "OK")
-            return getattr(self, input_fields[id]).has_value()
-        output_fields: dict[str, str] = getattr(self, "__output_fields")
-        if id in output_fields:
-            self._set_status("has_value", "OK")
-            return getattr(self, output_fields[id]).has_value()
-        self._set_status("has_value", "INVALID_ID")
-        return False
+        slot = self.__get_slot(id)
+        if slot is None:
+            self._set_status("has_value", "INVALID_ID")
+            return False
+        self._set_status("has_value", "OK")
+        return slot.has_value()
     
     # Get input or output value
     # PRE: `id` is valid input or output name
     # PRE: there is value at `id`
     @status("OK", "INVALID_ID", "NO_VALUE")
     def get(self, id: str) -> Any:
-        input_fields: dict[str, str] = getattr(self, "__input_fields")
-        if id in input_fields:
-            return self.__get_value(getattr(self, input_fields[id]))
-        output_fields: dict[str, str] = getattr(self, "__output_fields")
-        if id in output_fields:
-            return self.__get_value(getattr(self, output_fields[id]))
-        self._set_status("get", "INVALID_ID")
-        return None
-    
-    def __get_value(self, slot: Slot) -> Any:
+        slot = self.__get_slot(id)
+        if slot is None:
+            self._set_status("get", "INVALID_ID")
+            return None
         if not slot.has_value():
             self._set_status("get", "NO_VALUE")
             return None
         self._set_status("get", "OK")
-        return slot.get()
+        return slot._get_unchecked()
+
+    # Get input or output slot by id (`None` if there is no such id)
+    def __get_slot(self, id: str) -> Optional[Slot]:
+        slot = self.__input_slots.get(id)
+        if slot is None:
+            slot = self.__output_slots.get(id)
+        return slot
@@ -1,5 +1,7 @@
-from typing import Any, Callable, get_origin, get_args
-from inspect import getfullargspec
+from typing import Any, Callable, Mapping, get_origin, get_args
+from types import MappingProxyType
+from inspect import signature, Parameter
+import sys
 
 from tools import status
 from solver.base import Solver, SolverFactory, is_subtype
@@ -11,17 +13,55 @@ Func = Callable[..., Any]
 # Solver wrapping function
 class WrapperSolver(Solver):
 
-    __spec: "FuncSpec"
-    __inputs: dict[str, Any]
-    __outputs: dict[str, Any]
+    __func: Func
+    __input_ids: tuple[str, ...]
+    __output_ids: tuple[str, ...]
+    __input_spec: Mapping[str, type]
+    __output_spec: Mapping[str, type]
+    # Function returns single value instead of tuple
+    __single_output: bool
+    # Position of each input in function arguments
+    __input_indices: dict[str, int]
+    # Input and output types in argument and result order
+    __input_types: tuple[type, ...]
+    __output_types: tuple[type, ...]
+    # Input values in function argument order
+    __input_values: list[Any]
+    # Output values in function result order
+    __output_values: list[Any]
+    # Storage list, index and bit in `__missing_values` of each value
+    __value_places: dict[str, tuple[list[Any], int, int]]
+    # Bit mask of values that are not set
+    # (inputs come first, then outputs)
+    __missing_values: int
+    # Bits of inputs in `__missing_values`
+    __input_mask: int
 
 
     # CONSTRUCTOR
     def __init__(self, spec: "FuncSpec") -> None:
         super().__init__()
-        self.__spec = spec
-        self.__inputs = dict()
-        self.__outputs = dict()
+        self.__func = spec.get_func()
+        self.__input_ids = spec.get_input_ids()
+        self.__output_ids = spec.get_output_ids()
+        self.__input_spec = spec.get_input_spec()
+        self.__output_spec = spec.get_output_spec()
+        self.__single_output = spec.is_single_output()
+        self.__input_indices = spec.get_input_indices()
+        self.__input_types = spec.get_input_types()
+        self.__output_types = spec.get_output_types()
+        input_count = len(self.__input_ids)
+        self.__input_values = [None] * input_count
+        self.__output_values = [None] * len(self.__output_ids)
+        self.__value_places = dict()
+        for i, id in enumerate(self.__input_ids):
+            self.__value_places[id] = (self.__input_values, i, 1 << i)
+        for i, id in enumerate(self.__output_ids):
+            self.__value_places.setdefault(
+                id, (self.__output_values, i, 1 << (input_count + i)))
+        self.__missing_values = \
+            (1 << (input_count + len(self.__output_ids))) - 1
+        self.__input_mask = (1 << input_count) - 1
 
     
     # COMMANDS
@@ -32,13 +72,18 @@ class WrapperSolver(Solver):
     # POST: input `id` is equal to `value`
     @status("OK", "INVALID_ID", "INVALID_VALUE")
     def put(self, id: str, value: Any) -> None:
-        if not id in self.__spec.get_input_spec():
+        index = self.__input_indices.get(id)
+        if index is None:
             self._set_status("put", "INVALID_ID")
             return
-        if not is_subtype(type(value), self.__spec.get_input_spec()[id]):
+        input_type = self.__input_types[index]
+        value_type = type(value)
+        if value_type is not input_type \
+                and not is_subtype(value_type, input_type):
             self._set_status("put", "INVALID_VALUE")
             return
-        self.__inputs[id] = value
+        self.__input_values[index] = value
+        self.__missing_values &= ~(1 << index)
         self._set_status("put", "OK")
 
     # Run solver
@@ -47,79 +92,70 @@ class WrapperSolver(Solver):
     # POST: output values are set
     @status("OK", "INVALID_INPUT", "INTERNAL_ERROR")
     def run(self) -> None:
-        args = list[Any]()
-        for id in self.__spec.get_input_ids():
-            if id not in self.__inputs:
-                self._set_status("run", "INVALID_INPUT")
-                return
-            args.append(self.__inputs[id])
+        if self.__missing_values & self.__input_mask:
+            self._set_status("run", "INVALID_INPUT")
+            return
         try:
-            result = self.__spec.get_func()(*args)
-        except:
+            result = self.__func(*self.__input_values)
+        except Exception:
+            self._set_status("run", "INTERNAL_ERROR")
+            return
+        if not self.__output_types:
+            result = ()
+        elif self.__single_output:
+            result = (result,)
+        if len(result) != len(self.__output_types):
             self._set_status("run", "INTERNAL_ERROR")
             return
-        output_ids = self.__spec.get_output_ids()
-        output_spec = self.__spec.get_output_spec()
-        if len(output_ids) == 1:
-            result = tuple(result,)
-        for i in range(len(output_ids)):
-            value = result[i]
-            id = output_ids[i]
-            if not is_subtype(type(value), output_spec[id]):
+        output_bit = self.__input_mask + 1
+        for i, (output_type, value) in \
+                enumerate(zip(self.__output_types, result)):
+            value_type = type(value)
+            if value_type is not output_type \
+                    and not is_subtype(value_type, output_type):
                 self._set_status("run", "INTERNAL_ERROR")
                 return
-            self.__outputs[id] = value
+            self.__output_values[i] = value
+            self.__missing_values &= ~(output_bit << i)
         self._set_status("run", "OK")  
 
 
     # QUERIES
     
     # Get input value ids and types
-    def get_input_spec(self) -> dict[str, type]:
-        return self.__spec.get_input_spec()
+    def get_input_spec(self) -> Mapping[str, type]:
+        return self.__input_spec
 
     # Get output value ids and types
-    def get_output_spec(self) -> dict[str, type]:
-        return self.__spec.get_output_spec()
+    def get_output_spec(self) -> Mapping[str, type]:
+        return self.__output_spec
 
     # Check if input or output value is set
     # PRE: `id` is valid input or output name
     @status("OK", "INVALID_ID")
     def has_value(self, id: str) -> bool:
-        if id in self.__spec.get_input_ids():
-            self._set_status("has_value", "OK")
-            return id in self.__inputs
-        if id in self.__spec.get_output_ids():
-            self._set_status("has_value", "OK")
-            return id in self.__outputs
-        self._set_status("has_value", "INVALID_ID")
-        return False
+        place = self.__value_places.get(id)
+        if place is None:
+            self._set_status("has_value", "INVALID_ID")
+            return False
+        self._set_status("has_value", "OK")
+        return not self.__missing_values & place[2]
 
     # Get input or output value
     # PRE: `id` is valid input or output name
     # PRE: there is value at `id`
     @status("OK", "INVALID_ID", "NO_VALUE")
     def get(self, id: str) -> Any:
-        if id in self.__spec.get_input_ids():
-            return self.__get_input(id)
-        if id in self.__spec.get_output_ids():
-            return self.__get_output(id)
-        self._set_status("get", "INVALID_ID")
-        return None
-
-    def __get_input(self, id: str) -> Any:
-        if id not in self.__inputs:
-            self._set_status("get", "NO_VALUE")
+        place = self.__value_places.get(id)
+        if place is None:
+            self._set_status("get", "INVALID_ID")
             return None
-        self._set_status("get", "OK")
-        return self.__inputs[id]
-
-    def __get_output(self, id: str) -> Any:
-        if id not in self.__outputs:
+        values, index, bit = place
+        if self.__missing_values & bit:
             self._set_status("get", "NO_VALUE")
             return None
         self._set_status("get", "OK")
-        return self.__outputs[id]
+        return values[index]
 
 
 # Factory for solver wrapping function
@@ -143,7 +179,7 @@ class Wrapper(SolverFactory):
     # POST: output types are return tuple type elements
     def __init__(self, func: Func, output_ids: list[str]) -> None:
         super().__init__()
-        self.__spec = FuncSpec(func, output_ids)
+        self.__spec = FuncSpec(func, tuple(output_ids))
 
     # Create solver
     # POST: `Solver` inputs and outputs have no values
@@ -151,55 +187,84 @@ class Wrapper(SolverFactory):
         return WrapperSolver(self.__spec)
 
     # Get solver input value ids and types
-    def get_input_spec(self) -> dict[str, type]:
+    def get_input_spec(self) -> Mapping[str, type]:
         return self.__spec.get_input_spec()
 
     # Get solver output value ids and types
-    def get_output_spec(self) -> dict[str, type]:
+    def get_output_spec(self) -> Mapping[str, type]:
         return self.__spec.get_output_spec()
 
 
 class FuncSpec:
 
     __func: Func
-    __input_ids: list[str]
-    __output_ids: list[str]
+    __input_ids: tuple[str, ...]
+    __output_ids: tuple[str, ...]
     __input_spec: dict[str, type]
     __output_spec: dict[str, type]
+    __input_indices: dict[str, int]
+    __input_types: tuple[type, ...]
+    __output_types: tuple[type, ...]
+    __single_output: bool
 
-    def __init__(self, func: Func, output_ids: list[str]) -> None:
+    def __init__(self, func: Func, output_ids: tuple[str, ...]) -> None:
         self.__func = func
-        arg_spec = getfullargspec(func)
-        self.__input_ids = list()
-        self.__output_ids = output_ids
+        func_signature = signature(func)
+        self.__output_ids = tuple(map(sys.intern, output_ids))
         self.__input_spec = dict()
         self.__output_spec = dict()
-        for id in arg_spec.args:
-            self.__input_ids.append(id)
-            self.__input_spec[id] = arg_spec.annotations[id]
-        if "return" not in arg_spec.annotations:
+        self.__single_output = False
+        for param in func_signature.parameters.values():
+            if param.kind not in _POSITIONAL_KINDS:
+                continue
+            self.__input_spec[sys.intern(param.name)] = param.annotation
+        self.__input_ids = tuple(self.__input_spec)
+        self.__input_indices = \
+            {id: i for i, id in enumerate(self.__input_ids)}
+        self.__input_types = tuple(self.__input_spec.values())
+        return_type = func_signature.return_annotation
+        if return_type is Parameter.empty or return_type is None:
             assert len(output_ids) == 0
+            self.__output_types = ()
             return
-        return_type = arg_spec.annotations["return"]
         if get_origin(return_type) is not tuple:
             assert len(output_ids) == 1
-            self.__output_spec[output_ids[0]] = return_type
-            return
-        output_types = get_args(return_type)
-        for i in range(len(output_ids)):
-            self.__output_spec[output_ids[i]] = output_types[i]
+            self.__single_output = True
+            self.__output_types = (return_type,)
+        else:
+            self.__output_types = get_args(return_type)
+            assert len(self.__output_types) == len(output_ids)
+        self.__output_spec = dict(zip(self.__output_ids, self.__output_types))
 
     def get_func(self) -> Func:
         return self.__func
 
-    def get_input_ids(self) -> list[str]:
+    def get_input_ids(self) -> tuple[str, ...]:
         return self.__input_ids
     
-    def get_output_ids(self) -> list[str]:
+    def get_output_ids(self) -> tuple[str, ...]:
         return self.__output_ids
 
-    def get_input_spec(self) -> dict[str, type]:
-        return self.__input_spec
+    # Specs are shared by all solvers of the wrapper, so give read-only views
+    def get_input_spec(self) -> Mapping[str, type]:
+        return MappingProxyType(self.__input_spec)
     
-    def get_output_spec(self) -> dict[str, type]:
-        return self.__output_spec
+    def get_output_spec(self) -> Mapping[str, type]:
+        return MappingProxyType(self.__output_spec)
+
+    def get_input_indices(self) -> dict[str, int]:
+        return self.__input_indices
+
+    def get_input_types(self) -> tuple[type, ...]:
+        return self.__input_types
+
+    def get_output_types(self) -> tuple[type, ...]:
+        return self.__output_types
+
+    # Check if function returns single value instead of tuple
+    def is_single_output(self) -> bool:
+        return self.__single_output
+
+
+# Kinds of function parameters that are solver inputs
+_POSITIONAL_KINDS = (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
@@ -1,5 +1,5 @@
 import unittest
-from typing import Any, final, Type
+from typing import Any, final, Type, Iterable
 
 from nodes import DataNode, ProcNode, \
     InputData, OutputData, InputProc, OutputProc, \
@@ -80,15 +80,23 @@ class Test_DataNode(unittest.TestCase):
             super().__init__()
         
         @status()
-        def invalidate(self, input: InputData) -> None:
+        def invalidate(self, input: InputData) -> Iterable[OutputData]:
             self._set_status("invalidate", "OK")
             self.log("invalidate", input)
+            return ()
 
 
     class LoggingProc(LoggingInputProc, LoggingOutputProc):
         pass
 
 
+    class RaisingOutputProc(OutputProc):
+
+        @status()
+        def invalidate(self, input: InputData) -> Iterable[OutputData]:
+            raise RuntimeError()
+
+
     def test_init_no_input(self):
         d = DataNode(str)
         self.assertTrue(d.is_status("init", "OK"))
@@ -167,6 +175,10 @@ class Test_DataNode(unittest.TestCase):
         self.assertTrue(d.is_valid())
         self.assertEqual(o1.get_log(), [("invalidate", d)])
         self.assertEqual(o2.get_log(), [("invalidate", d)])
+        d.put(2)
+        self.assertTrue(d.is_status("put", "OK"))
+        self.assertEqual(o1.get_log(), [("invalidate", d)] * 2)
+        self.assertEqual(o2.get_log(), [("invalidate", d)] * 2)
 
 
     def test_get(self):
@@ -246,6 +258,15 @@ class Test_DataNode(unittest.TestCase):
         self.assertEqual(o2.get_log(), [("invalidate", d)])
 
 
+    def test_invalidate_outputs_error(self):
+        d = DataNode(int)
+        d.add_output(self.RaisingOutputProc())
+        d.put(7)
+        with self.assertRaises(RuntimeError):
+            d.invalidate()
+        self.assertTrue(d.is_valid())
+
+
 class Test_ProcNode(unittest.TestCase):
 
     class LoggingInputData(Logger, InputData):
@@ -506,13 +527,13 @@ class Test_ProcNode(unittest.TestCase):
         d.reset_log()
         pl.reset_log()
         self.assertTrue(p.is_status("invalidate", "NIL"))
-        p.invalidate(b)
+        self.assertEqual(list(p.invalidate(b)), [])
         self.assertTrue(p.is_status("invalidate", "NOT_INPUT"))
-        p.invalidate(a)
+        self.assertEqual(set(p.invalidate(a)), {c, d})
         self.assertTrue(p.is_status("invalidate", "OK"))
         self.assertEqual(pl.get_log(), [])
-        self.assertEqual(c.get_log(), ["invalidate"])
-        self.assertEqual(d.get_log(), ["invalidate"])
+        self.assertEqual(c.get_log(), [])
+        self.assertEqual(d.get_log(), [])
 
 
     def test_validate(self):
@@ -659,12 +680,44 @@ class Divmod(SimpleProc):
         self.__quotient, self.__remainder = divmod(self.__left, self.__right)
 
 
+class Copy(SimpleProc):
+
+    INPUTS = ["source"]
+    OUTPUTS = ["dest"]
+    __source: int
+    __dest: int
+
+    def _is_valid_value(self, slot: str) -> bool:
+        return True
+
+    def run(self) -> None:
+        self.__dest = self.__source
+
+
+class Test_LongChain(unittest.TestCase):
+
+    def test_invalidate(self):
+        nodes = [DataNode(int)]
+        for _ in range(2000):
+            proc = ProcNode(Copy, {"source": nodes[-1]})
+            nodes.append(DataNode(int))
+            proc.add_output("dest", nodes[-1])
+        for node in nodes:
+            node.put(1)
+        self.assertTrue(nodes[-1].is_valid())
+        nodes[0].put(2)
+        self.assertFalse(nodes[1].is_valid())
+        self.assertFalse(nodes[-1].is_valid())
+
+
 class Test_SimpleProc(unittest.TestCase):
     
     def test(self):
         self.assertEqual(Divmod.get_input_types(), {"left": int, "right": int})
         dm = Divmod.create({"left": int, "right": int})
         self.assertEqual(dm.get_output_types(), {"quotient": int, "remainder": int})
+        with self.assertRaises(TypeError):
+            Divmod.get_input_types()["x"] = int  # type: ignore
         dm.put("left", 101)
         self.assertTrue(dm.is_status("put", "OK"))
         dm.put("right", 7)
@@ -1,4 +1,5 @@
 import unittest
+from functools import partial
 
 from procedure import Slot, Calculator, Input, Output, Wrapper, Block
 from tools import status
@@ -33,6 +34,19 @@ class Test_Slot(unittest.TestCase):
         s.clear()
         self.assertFalse(s.has_data())
 
+    def test_callbacks(self):
+        events = list[str]()
+        s = Slot(int, lambda: events.append("fill"),
+            lambda: events.append("clear"))
+        s.clear()
+        s.set("foo")
+        s.set(1)
+        s.set(2)
+        s.clear()
+        s.clear()
+        s.set(3)
+        self.assertEqual(events, ["fill", "clear", "fill"])
+
     def test_get(self):
         s = Slot(int)
         self.assertTrue(s.is_status("get", "NIL"))
@@ -42,6 +56,25 @@ class Test_Slot(unittest.TestCase):
         self.assertEqual(s.get(), 1)
         self.assertTrue(s.is_status("get", "OK"))
 
+    def test_repeated_status(self):
+        s = Slot(int)
+        s.set(1)
+        s.set(2)
+        self.assertTrue(s.is_status("set", "OK"))
+        s.set("foo")
+        self.assertTrue(s.is_status("set", "INVALID_TYPE"))
+        s.set(3)
+        self.assertTrue(s.is_status("set", "OK"))
+        self.assertEqual(s.get(), 3)
+        self.assertEqual(s.get(), 3)
+        self.assertTrue(s.is_status("get", "OK"))
+        s.clear()
+        s.get()
+        self.assertTrue(s.is_status("get", "NO_DATA"))
+        s.set(4)
+        self.assertEqual(s.get(), 4)
+        self.assertTrue(s.is_status("get", "OK"))
+
 
 class Test_Calculator(unittest.TestCase):
 
@@ -134,6 +167,13 @@ class Test_Calculator(unittest.TestCase):
         b.set("error")
         dm.run()
         self.assertTrue(dm.is_status("run", "INTERNAL_ERROR"))
+        b.set("foo")
+        a.clear()
+        dm.run()
+        self.assertTrue(dm.is_status("run", "INVALID_INPUT"))
+        a.set(1)
+        dm.run()
+        self.assertTrue(dm.is_status("run", "OK"))
 
 
 class Test_Wrapper(unittest.TestCase):
@@ -205,6 +245,37 @@ class Test_Wrapper(unittest.TestCase):
         self.assertTrue(w.is_status("run", "OK"))
         self.assertEqual(c.get(), 2)
         self.assertEqual(d.get(), "boo")
+        a.clear()
+        w.run()
+        self.assertTrue(w.is_status("run", "INVALID_INPUT"))
+
+    def test_run_single(self):
+        def func(a: int) -> int:
+            return 2 * a
+        w = Wrapper(func, ["b"])
+        w.get_input("a").set(3)
+        w.run()
+        self.assertTrue(w.is_status("run", "OK"))
+        self.assertEqual(w.get_output("b").get(), 6)
+
+    def test_partial(self):
+        w = Wrapper(partial(self.func, 1), ["c", "d"])
+        self.assertEqual(w.get_input_ids(), {"b"})
+        w.get_input("b").set("foo")
+        w.run()
+        self.assertTrue(w.is_status("run", "OK"))
+        self.assertEqual(w.get_output("c").get(), 2)
+
+    def test_callable_object(self):
+        class Double:
+            def __call__(self, a: int) -> int:
+                return 2 * a
+        w = Wrapper(Double(), ["b"])
+        self.assertEqual(w.get_input_ids(), {"a"})
+        w.get_input("a").set(3)
+        w.run()
+        self.assertTrue(w.is_status("run", "OK"))
+        self.assertEqual(w.get_output("b").get(), 6)
 
 
 class Test_Block(unittest.TestCase):
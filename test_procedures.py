@@ -1,4 +1,6 @@
 import unittest
+from math import copysign
+from concurrent.futures import ThreadPoolExecutor
 
 from typing import Any
 
@@ -30,12 +32,54 @@ class Divmod(Calculator):
         self._set_status("calculate", "OK")
 
 
+class MemoDivmod(Calculator):
+
+    INPUTS = ["left", "right"]
+    OUTPUTS = ["quotient", "remainder"]
+    MEMO_SIZE = 2
+    __left: int
+    __right: int
+    __quotient: int
+    __remainder: int
+    calculations = 0
+
+    def _is_valid_value(self, slot: str, value: Any) -> bool:
+        return True
+
+    @status()
+    def calculate(self) -> None:
+        self.calculations += 1
+        self.__quotient, self.__remainder = divmod(self.__left, self.__right)
+        self._set_status("calculate", "OK")
+
+
+class MemoSign(Calculator):
+
+    INPUTS = ["value"]
+    OUTPUTS = ["sign"]
+    MEMO_SIZE = 2
+    __value: float
+    __sign: float
+    calculations = 0
+
+    def _is_valid_value(self, slot: str, value: Any) -> bool:
+        return True
+
+    @status()
+    def calculate(self) -> None:
+        self.calculations += 1
+        self.__sign = copysign(1.0, self.__value)
+        self._set_status("calculate", "OK")
+
+
 class Test_Calculator(unittest.TestCase):
 
     def test_slots(self):
         dm = Divmod()
         self.assertEqual(dm.get_input_slots(), {"left": int, "right": int})
         self.assertEqual(dm.get_output_slots(), {"quotient": int, "remainder": int})
+        with self.assertRaises(TypeError):
+            dm.get_input_slots()["x"] = int  # type: ignore
 
 
     def test_set(self):
@@ -91,6 +135,47 @@ class Test_Calculator(unittest.TestCase):
         self.assertTrue(dm.needs_run())
 
 
+    def test_memo(self):
+        dm = MemoDivmod()
+        for left, calculations in [(101, 1), (11, 2), (101, 2), (30, 3),
+                (11, 4), (30, 4)]:
+            dm.put("left", left)
+            dm.put("right", 7)
+            dm.run()
+            self.assertTrue(dm.is_status("run", "OK"))
+            self.assertEqual(dm.calculations, calculations)
+            self.assertEqual(dm.get("quotient"), left // 7)
+            self.assertEqual(dm.get("remainder"), left % 7)
+
+
+    def test_memo_typed(self):
+        dm = MemoDivmod()
+        dm.put("right", 7)
+        dm.put("left", 1)
+        dm.run()
+        self.assertEqual(dm.calculations, 1)
+        dm.put("left", True)
+        dm.run()
+        self.assertTrue(dm.is_status("run", "OK"))
+        self.assertEqual(dm.calculations, 2)
+
+
+    def test_memo_signed_zero(self):
+        ms = MemoSign()
+        ms.put("value", 0.0)
+        ms.run()
+        self.assertEqual(ms.get("sign"), 1.0)
+        ms.put("value", -0.0)
+        ms.run()
+        self.assertTrue(ms.is_status("run", "OK"))
+        self.assertEqual(ms.calculations, 2)
+        self.assertEqual(ms.get("sign"), -1.0)
+        ms.put("value", 0.0)
+        ms.run()
+        self.assertEqual(ms.calculations, 2)
+        self.assertEqual(ms.get("sign"), 1.0)
+
+
     def test_get(self):
         dm = Divmod()
         dm.put("left", 101)
@@ -122,6 +207,9 @@ class Test_Composition(unittest.TestCase):
         self.assertTrue(comp.is_status("init", "OK"))
         self.assertEqual(comp.get_input_slots(), {"a": int, "b": int, "c": int})
         self.assertEqual(comp.get_output_slots(), {"d": int, "f": int, "g": int})
+        with self.assertRaises(TypeError):
+            comp.get_input_slots()["x"] = int  # type: ignore
+        self.assertIs(comp.get_input_slots(), comp.get_input_slots())
 
 
     def test_set(self):
@@ -187,6 +275,188 @@ class Test_Composition(unittest.TestCase):
         self.assertFalse(comp.needs_run())
 
 
+    def test_put_same_value(self):
+        # d, e = divmod(a, b)
+        # f, g = divmod(e, c)
+        comp = Composition([
+            (Divmod(),
+                {"left": "a", "right": "b"},
+                {"quotient": "d", "remainder": "e"}),
+            (Divmod(),
+                {"left": "e", "right": "c"},
+                {"quotient": "f", "remainder": "g"}),
+            ])
+        comp.put("a", 117)
+        comp.put("b", 20)
+        comp.put("c", 5)
+        comp.run()
+        comp.put("b", 20)
+        self.assertTrue(comp.is_status("put", "OK"))
+        self.assertFalse(comp.needs_run())
+        comp.put("b", 0)
+        self.assertTrue(comp.is_status("put", "INVALID_VALUE"))
+        comp.put("b", 20)
+        self.assertTrue(comp.is_status("put", "OK"))
+        self.assertTrue(comp.needs_run())
+        comp.run()
+        self.assertEqual(comp.get("d"), 5)
+        self.assertEqual(comp.get("g"), 2)
+
+
+    def test_put_signed_zero(self):
+        comp = Composition([
+            (MemoSign(), {"value": "x"}, {"sign": "s"}),
+            ])
+        comp.put("x", 0.0)
+        comp.run()
+        self.assertEqual(comp.get("s"), 1.0)
+        comp.put("x", -0.0)
+        self.assertTrue(comp.is_status("put", "OK"))
+        self.assertTrue(comp.needs_run())
+        comp.run()
+        self.assertEqual(comp.get("s"), -1.0)
+
+
+    def test_get_unaffected_output(self):
+        # d, e = divmod(a, b)
+        # f, g = divmod(e, c)
+        comp = Composition([
+            (Divmod(),
+                {"left": "a", "right": "b"},
+                {"quotient": "d", "remainder": "e"}),
+            (Divmod(),
+                {"left": "e", "right": "c"},
+                {"quotient": "f", "remainder": "g"}),
+            ])
+        comp.put("a", 117)
+        comp.put("b", 20)
+        comp.put("c", 5)
+        comp.run()
+        comp.put("c", 3)
+        self.assertTrue(comp.needs_run())
+        self.assertEqual(comp.get("d"), 5)
+        self.assertTrue(comp.is_status("get", "OK"))
+        comp.get("f")
+        self.assertTrue(comp.is_status("get", "NEEDS_RUN"))
+        comp.run()
+        self.assertEqual(comp.get("f"), 5)
+
+
+    def test_run_changed_only(self):
+        # d, e = divmod(a, b)
+        # f, g = divmod(e, c)
+        second = Divmod()
+        runs = [0]
+        calculate = second.calculate
+        def counted_calculate() -> None:
+            runs[0] += 1
+            calculate()
+        second.calculate = counted_calculate  # type: ignore
+        comp = Composition([
+            (Divmod(),
+                {"left": "a", "right": "b"},
+                {"quotient": "d", "remainder": "e"}),
+            (second,
+                {"left": "e", "right": "c"},
+                {"quotient": "f", "remainder": "g"}),
+            ])
+        comp.put("a", 117)
+        comp.put("b", 20)
+        comp.put("c", 5)
+        comp.run()
+        self.assertEqual(runs[0], 1)
+        comp.put("a", 137)
+        comp.run()
+        self.assertTrue(comp.is_status("run", "OK"))
+        self.assertEqual(runs[0], 1)
+        self.assertEqual(comp.get("d"), 6)
+        self.assertEqual(comp.get("f"), 3)
+        comp.put("a", 138)
+        comp.run()
+        self.assertEqual(runs[0], 2)
+        self.assertEqual(comp.get("f"), 3)
+        self.assertEqual(comp.get("g"), 3)
+
+
+    def test_selected_outputs(self):
+        # d, e = divmod(a, b)
+        # f, g = divmod(a, c)
+        comp = Composition([
+            (Divmod(),
+                {"left": "a", "right": "b"},
+                {"quotient": "d", "remainder": "e"}),
+            (Divmod(),
+                {"left": "a", "right": "c"},
+                {"quotient": "f", "remainder": "g"}),
+            ], outputs=["g"])
+        self.assertEqual(comp.get_output_slots(), {"g": int})
+        comp.put("a", 117)
+        comp.put("c", 5)
+        comp.run()
+        self.assertTrue(comp.is_status("run", "OK"))
+        self.assertEqual(comp.get("g"), 2)
+        comp.get("d")
+        self.assertTrue(comp.is_status("get", "INVALID_SLOT"))
+
+
+    def test_nested(self):
+        # d, e = divmod(a, b)
+        # f, g = divmod(e, c)
+        inner = Composition([
+            (Divmod(),
+                {"left": "a", "right": "b"},
+                {"quotient": "d", "remainder": "e"}),
+            ])
+        comp = Composition([
+            (inner,
+                {"a": "a", "b": "b"},
+                {"d": "d", "e": "e"}),
+            (Divmod(),
+                {"left": "e", "right": "c"},
+                {"quotient": "f", "remainder": "g"}),
+            ])
+        comp.put("a", 117)
+        comp.put("b", 20)
+        comp.put("c", 5)
+        comp.run()
+        self.assertTrue(comp.is_status("run", "OK"))
+        self.assertEqual(comp.get("d"), 5)
+        self.assertEqual(comp.get("f"), 3)
+        self.assertEqual(comp.get("g"), 2)
+
+
+    def test_run_parallel(self):
+        # d, e = divmod(a, b)
+        # f, g = divmod(a, c)
+        # h, i = divmod(d, f)
+        comp = Composition([
+            (Divmod(),
+                {"left": "d", "right": "f"},
+                {"quotient": "h", "remainder": "i"}),
+            (Divmod(),
+                {"left": "a", "right": "b"},
+                {"quotient": "d", "remainder": "e"}),
+            (Divmod(),
+                {"left": "a", "right": "c"},
+                {"quotient": "f", "remainder": "g"}),
+            ])
+        comp.put("a", 117)
+        comp.put("b", 5)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            comp.run_parallel(executor)
+            self.assertTrue(comp.is_status("run_parallel", "INVALID_INPUT"))
+            comp.put("c", 20)
+            comp.run_parallel(executor)
+            self.assertTrue(comp.is_status("run_parallel", "OK"))
+            self.assertFalse(comp.needs_run())
+            self.assertEqual(comp.get("h"), 4)
+            self.assertEqual(comp.get("i"), 3)
+            comp.put("c", -20)
+            comp.run_parallel(executor)
+            self.assertTrue(comp.is_status("run_parallel", "RUN_FAILED"))
+            self.assertTrue(comp.needs_run())
+
+
     def test_get(self):
         # d, e = divmod(a, b)
         # f, g = divmod(e, c)
@@ -210,5 +480,91 @@ class Test_Composition(unittest.TestCase):
         self.assertTrue(comp.is_status("get", "OK"))
 
 
+    def test_run_order(self):
+        # f, g = divmod(e, c)
+        # d, e = divmod(a, b)
+        comp = Composition([
+            (Divmod(),
+                {"left": "e", "right": "c"},
+                {"quotient": "f", "remainder": "g"}),
+            (Divmod(),
+                {"left": "a", "right": "b"},
+                {"quotient": "d", "remainder": "e"}),
+            ])
+        comp.put("a", 117)
+        comp.put("b", 20)
+        comp.put("c", 5)
+        comp.run()
+        self.assertTrue(comp.is_status("run", "OK"))
+        self.assertEqual(comp.get("d"), 5)
+        self.assertEqual(comp.get("f"), 3)
+        self.assertEqual(comp.get("g"), 2)
+
+
+    def test_run_missing_input(self):
+        # d, e = divmod(a, b)
+        # f, g = divmod(e, c)
+        comp = Composition([
+            (Divmod(),
+                {"left": "a", "right": "b"},
+                {"quotient": "d", "remainder": "e"}),
+            (Divmod(),
+                {"left": "e", "right": "c"},
+                {"quotient": "f", "remainder": "g"}),
+            ])
+        comp.put("a", 117)
+        comp.put("b", 20)
+        comp.run()
+        self.assertTrue(comp.is_status("run", "INVALID_INPUT"))
+        self.assertTrue(comp.needs_run())
+
+
+    def test_run_fail(self):
+        # d, e = divmod(a, b)
+        # f, g = divmod(e, c)
+        comp = Composition([
+            (Divmod(),
+                {"left": "a", "right": "b"},
+                {"quotient": "d", "remainder": "e"}),
+            (Divmod(),
+                {"left": "e", "right": "c"},
+                {"quotient": "f", "remainder": "g"}),
+            ])
+        comp.put("a", 117)
+        comp.put("b", 20)
+        comp.put("c", -5)
+        comp.run()
+        self.assertTrue(comp.is_status("run", "RUN_FAILED"))
+        self.assertTrue(comp.needs_run())
+        comp.put("c", 5)
+        comp.run()
+        self.assertTrue(comp.is_status("run", "OK"))
+        self.assertEqual(comp.get("f"), 3)
+
+
+    def test_run_rejected_value(self):
+        # d, e = divmod(a, b)
+        # f, g = divmod(a, e)
+        comp = Composition([
+            (Divmod(),
+                {"left": "a", "right": "b"},
+                {"quotient": "d", "remainder": "e"}),
+            (Divmod(),
+                {"left": "a", "right": "e"},
+                {"quotient": "f", "remainder": "g"}),
+            ])
+        comp.put("a", 120)
+        comp.put("b", 20)
+        comp.run()
+        self.assertTrue(comp.is_status("run", "RUN_FAILED"))
+        comp.run()
+        self.assertTrue(comp.is_status("run", "RUN_FAILED"))
+        self.assertTrue(comp.needs_run())
+        comp.put("b", 50)
+        comp.run()
+        self.assertTrue(comp.is_status("run", "OK"))
+        self.assertEqual(comp.get("f"), 6)
+
+
 if __name__ == "__main__":
     unittest.main()
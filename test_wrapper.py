@@ -9,6 +9,35 @@ def func(a: int, b: str) -> tuple[int, str]:
     return a * 2, b + b
 
 
+def half(a: float) -> float:
+    return a / 2
+
+
+def short(a: int) -> tuple[int, int]:
+    return a,  # type: ignore
+
+
+def nothing(a: int):
+    pass
+
+
+def half_tuple(a: float) -> tuple[float]:
+    return a / 2,
+
+
+class Scale:
+
+    def __init__(self, factor: float) -> None:
+        self.factor = factor
+
+    # Makes instances unhashable
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Scale) and other.factor == self.factor
+
+    def __call__(self, a: float) -> float:
+        return a * self.factor
+
+
 class Test_Wrapper(unittest.TestCase):
     
     def test_spec(self):
@@ -21,6 +50,15 @@ class Test_Wrapper(unittest.TestCase):
         self.assertEqual(w.get_input_spec(), {"a": int, "b": str})
         self.assertEqual(w.get_output_spec(), {"c": int, "d": str})
 
+    def test_spec_read_only(self):
+        W = Wrapper(func, ["c", "d"])
+        with self.assertRaises(TypeError):
+            W.get_input_spec()["x"] = int  # type: ignore
+        with self.assertRaises(TypeError):
+            W.create().get_output_spec()["x"] = int  # type: ignore
+        self.assertEqual(Wrapper(func, ["c", "d"]).get_input_spec(),
+            {"a": int, "b": str})
+
     def test_put(self):
         w = Wrapper(func, ["c", "d"]).create()
         self.assertTrue(w.is_status("put", "NIL"))
@@ -112,6 +150,43 @@ class Test_Wrapper(unittest.TestCase):
         self.assertEqual(w.get("d"), "foofoo")
         self.assertTrue(w.is_status("get", "OK"))
 
+    def test_short_result(self):
+        w = Wrapper(short, ["b", "c"]).create()
+        w.put("a", 1)
+        w.run()
+        self.assertTrue(w.is_status("run", "INTERNAL_ERROR"))
+
+    def test_no_output(self):
+        w = Wrapper(nothing, []).create()
+        w.put("a", 1)
+        w.run()
+        self.assertTrue(w.is_status("run", "OK"))
+
+    def test_single_output(self):
+        w = Wrapper(half, ["b"]).create()
+        self.assertEqual(w.get_output_spec(), {"b": float})
+        w.put("a", 5)
+        self.assertTrue(w.is_status("put", "OK"))
+        w.run()
+        self.assertTrue(w.is_status("run", "OK"))
+        self.assertEqual(w.get("b"), 2.5)
+
+    def test_single_tuple_output(self):
+        w = Wrapper(half_tuple, ["b"]).create()
+        self.assertEqual(w.get_output_spec(), {"b": float})
+        w.put("a", 5)
+        w.run()
+        self.assertTrue(w.is_status("run", "OK"))
+        self.assertEqual(w.get("b"), 2.5)
+
+    def test_unhashable_func(self):
+        w = Wrapper(Scale(3), ["b"]).create()
+        self.assertEqual(w.get_input_spec(), {"a": float})
+        w.put("a", 2)
+        w.run()
+        self.assertTrue(w.is_status("run", "OK"))
+        self.assertEqual(w.get("b"), 6)
+
 
 if __name__ == "__main__":
     unittest.main()
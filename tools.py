@@ -1,9 +1,11 @@
 from typing import Any, Callable, final, TypeVar
 from abc import ABC, ABCMeta
+import sys
 
 _METHOD_STATUS_NAME = "__method_status_name"
 _METHOD_STATUSES = "__method_statuses"
 _CLASS_STATUSES = "__class_statuses"
+_INITIAL_STATUS = "__initial_status"
 
 T = TypeVar("T")
 AnyFunc = Callable[..., T]
@@ -11,6 +13,8 @@ AnyFunc = Callable[..., T]
 # Decorator that adds status management to method
 # and defines allowed status values.
 # Note that if 'NIL' value is not listed it will be added automatically.
+# Status names and values are interned so that status checks against
+# string literals mostly reduce to identity comparison.
 #
 # Usage:
 #    # method with status 'method' that can have values 'VAL1' and 'VAL2'
@@ -37,8 +41,8 @@ AnyFunc = Callable[..., T]
 def status(*args: str, **kwargs: str) -> Callable[[AnyFunc[T]], AnyFunc[T]]:
     assert len(set(kwargs.keys()).difference(set(["name"]))) == 0, \
         f"Only 'name' keyword argument accepted"
-    status_name = kwargs.get("name", "")
-    status_values = set(args)
+    status_name = sys.intern(kwargs.get("name", ""))
+    status_values = set(map(sys.intern, args))
     if len(status_values) > 0 and "NIL" not in status_values:
         status_values.add("NIL")
     def decorator(func: AnyFunc[T]) -> AnyFunc[T]:
@@ -88,6 +92,7 @@ class StatusMeta(ABCMeta):
                 f"No values provided for '{status_name}' status of {class_name}"
             all_status_values[status_name] = status_values
         namespace[_CLASS_STATUSES] = all_status_values
+        namespace[_INITIAL_STATUS] = dict.fromkeys(all_status_values, "NIL")
         return super().__new__(cls, class_name, bases, namespace, **kwargs)
 
 
@@ -113,14 +118,15 @@ class StatusMeta(ABCMeta):
 #
 class Status(ABC, metaclass=StatusMeta):
 
+    __slots__ = ("__status",)
+
     __status: dict[str, str]
 
 
     # CONSTRUCTOR
     # POST: all defined statuses are set to 'NIL'
     def __init__(self) -> None:
-        self.__status = dict([(name, "NIL") \
-            for name, _ in getattr(self, _CLASS_STATUSES).items()])
+        self.__status = getattr(self, _INITIAL_STATUS).copy()
 
     
     # COMMANDS
@@ -132,9 +138,8 @@ class Status(ABC, metaclass=StatusMeta):
     # POST: status 'name' is changed to 'value'
     @final
     def _set_status(self, name: str, value: str) -> None:
-        assert name in self.__status, self.__no_status_message(name)
-        assert value in getattr(self, _CLASS_STATUSES)[name], \
-            self.__no_status_value_message(name, value)
+        assert value in getattr(self, _CLASS_STATUSES).get(name, ()), \
+            self.__bad_status_message(name, value)
         self.__status[name] = value
 
 
@@ -157,12 +162,16 @@ class Status(ABC, metaclass=StatusMeta):
     # PRE: 'value' is defined value for 'name' status
     @final
     def is_status(self, name: str, value: str) -> bool:
-        assert name in self.__status, self.__no_status_message(name)
-        assert value in getattr(self, _CLASS_STATUSES)[name], \
-            self.__no_status_value_message(name, value)
+        assert value in getattr(self, _CLASS_STATUSES).get(name, ()), \
+            self.__bad_status_message(name, value)
         return self.__status[name] == value
 
 
+    def __bad_status_message(self, name: str, value: str) -> str:
+        if name not in self.__status:
+            return self.__no_status_message(name)
+        return self.__no_status_value_message(name, value)
+
     def __no_status_message(self, name: str) -> str:
         return f"No '{name}' status for {self.__class__.__name__}"
 